@@ -1,34 +1,28 @@
-from pathlib import Path
 import numpy as np
 
 from agents.agent import Agent
-
-WEIGHTS_PATH = Path('data/weights/')
+from utils.weights import WeightStore, WEIGHTS_PATH
 
 class HeuristicAgent(Agent):
 
     def __init__(self, name, weights_path=WEIGHTS_PATH):
         super().__init__(name)
+        self._store = WeightStore(weights_path)
+        # game name : latest weights, loaded on first game played
         self._weights = {}
 
-        for path in weights_path.iterdir():
-            # 'data/weights/tictactoe.txt' -> 'tictactoe'
-            game_name = path.name[:-4]
-            weights = np.genfromtxt(path, delimiter='\n', dtype=np.float64)
-            self._weights[game_name] = weights
-
     def act(self, game):
         """Evaluate afterstate of each action. Linear appprox most valuable."""
         board = game._board
         actions = game.legal_actions()
+        if game._name not in self._weights:
+            self._weights[game._name] = self._store.load(game._name)
         weights = self._weights[game._name]
-        values = np.zeros(len(actions))
+        # untrained game, all afterstates equally valuable
+        if weights is None:
+            return actions[0]
         argext = np.argmax if board.turn() == 1 else np.argmin
 
-        for i, action in enumerate(actions):
-            board.append(action)
-            values[i] = weights @ board.heuristic()
-            board.pop()
-
+        values = board.afterstate_values(actions, weights)
         action = actions[argext(values)]
         return action
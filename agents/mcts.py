@@ -0,0 +1,40 @@
+from agents.agent import Agent
+from mcts.search import MCTS
+from mcts.parallel import RootParallelMCTS, TreeParallelMCTS
+
+PARALLEL = {'root' : RootParallelMCTS, 'tree' : TreeParallelMCTS}
+
+class MCTSAgent(Agent):
+    """Act by Monte Carlo tree search. Most visited action of root."""
+
+    def __init__(self, name='mcts', playouts=1000, seconds=None, c=1.4,
+                 weights=None, workers=1, parallel='root'):
+        """Search playouts per action, or seconds if given.
+
+        Args
+        ----
+        name - str
+        playouts - int, None if seconds
+        seconds - float, None if playouts
+        c - float, exploration constant
+        weights - array, linear approx leaf values instead of rollouts
+        workers - int, search in worker processes if more than 1
+        parallel - str, 'root' or 'tree' parallel search of workers
+
+        """
+        super().__init__(name)
+        self._playouts = None if seconds else playouts
+        self._seconds = seconds
+        if workers > 1:
+            self._search = PARALLEL[parallel](workers, c, weights)
+        else:
+            self._search = MCTS(c, weights)
+
+    def act(self, game):
+        return self._search.best_action(game._board, self._playouts,
+                                        self._seconds)
+
+    def close(self):
+        """Stop worker processes of parallel search."""
+        if hasattr(self._search, 'close'):
+            self._search.close()
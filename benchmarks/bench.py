@@ -0,0 +1,120 @@
+"""Shared helpers: time random games on interchangeable board backends."""
+import argparse
+import io
+import logging
+import os
+import random
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+from games.game import Game
+from agents.random import RandomAgent
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# playouts loop run by the interpreter inside an old revision of the tree
+PLAYOUTS = """
+import random, time
+from {module} import {cls} as boardcls
+board = boardcls()
+for _ in range({repeat}):
+    random.seed({seed})
+    start = time.perf_counter()
+    for _ in range({games}):
+        board.clear()
+        while board:
+            board.append(random.choice(board.legal_actions()))
+    print({games} / (time.perf_counter() - start))
+"""
+
+def get_parser(description):
+    """Return argument parser with options common to board benchmarks."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--games', '-g', type=int, default=1000,
+                        help='number of random games per board')
+    parser.add_argument('--seed', '-s', type=int, default=0,
+                        help='random seed, same games played on every board')
+    parser.add_argument('--log', '-l', action='store_true',
+                        help='keep game debug logging on')
+    return parser
+
+def playouts(name, board, num_games):
+    """Play random games directly on board. Return games per second."""
+    start = time.perf_counter()
+    for _ in range(num_games):
+        board.clear()
+        while board:
+            board.append(random.choice(board.legal_actions()))
+    return num_games / (time.perf_counter() - start)
+
+def revision_playouts(rev, boardcls, num_games, seed, repeat=1):
+    """Return best games per second of playouts on boardcls at revision rev.
+
+    The revision is extracted to a temporary directory and timed in a
+    subprocess, so the baseline stays fixed however the tree changes since.
+
+    """
+    archive = subprocess.run(['git', 'archive', rev], cwd=ROOT, check=True,
+                             stdout=subprocess.PIPE).stdout
+    with tempfile.TemporaryDirectory() as tmp:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(tmp)
+        code = PLAYOUTS.format(module=boardcls.__module__,
+                               cls=boardcls.__name__, games=num_games,
+                               seed=seed, repeat=repeat)
+        out = subprocess.run([sys.executable, '-c', code], cwd=tmp,
+                             check=True, stdout=subprocess.PIPE,
+                             universal_newlines=True).stdout
+    return max(map(float, out.split()))
+
+def compare_revision(rev, baseline, boardcls, args, repeat=5):
+    """Print playouts per second of baseline at rev, speedup of boardcls.
+
+    Each rate is the best of repeat runs, timing noise only slows a run.
+
+    """
+    base = revision_playouts(rev, baseline, args.games, args.seed, repeat)
+    board = boardcls()
+    rates = []
+    for _ in range(repeat):
+        random.seed(args.seed)
+        rates.append(playouts(None, board, args.games))
+    rate = max(rates)
+    print('{:<10}{:<22}{:>10.1f} games/s'.format(
+        rev, baseline.__name__, base))
+    print('{:<10}{:<22}{:>10.1f} games/s'.format(
+        'current', boardcls.__name__, rate))
+    print('{:<10}{:<22}{:>10.2f}x'.format('playouts', 'speedup', rate / base))
+    return rate / base
+
+def games(name, board, num_games):
+    """Play random agents through Game.run. Return games per second."""
+    game = Game(name, board, RandomAgent('random1'), RandomAgent('random2'))
+    start = time.perf_counter()
+    for _ in range(num_games):
+        game.clear()
+        game.run()
+    return num_games / (time.perf_counter() - start)
+
+def compare(name, boardclss, args, benches=(playouts, games)):
+    """Print games per second of each board class, speedup over the first.
+
+    Game debug logging writes every board to file and dominates the games
+    benchmark, so it is switched off unless args.log is set.
+
+    """
+    if not args.log:
+        logging.getLogger('games.game').setLevel(logging.INFO)
+    for bench in benches:
+        rates = []
+        for boardcls in boardclss:
+            random.seed(args.seed)
+            rates.append(bench(name, boardcls(), args.games))
+            print('{:<10}{:<22}{:>10.1f} games/s'.format(
+                bench.__name__, boardcls.__name__, rates[-1]))
+        for boardcls, rate in zip(boardclss[1:], rates[1:]):
+            print('{:<10}{:<22}{:>10.2f}x'.format(
+                bench.__name__, 'speedup', rate / rates[0]))
@@ -0,0 +1,14 @@
+"""Compare games per second of CheckersBoard and CheckersBitBoard.
+
+python -m benchmarks.checkers --games 100
+
+"""
+from boards.checkers import CheckersBoard, CheckersBitBoard
+from benchmarks.bench import get_parser, compare
+
+PARSER = get_parser('Benchmark checkers boards.')
+PARSER.set_defaults(games=100)
+
+if __name__ == '__main__':
+    compare('checkers', (CheckersBoard, CheckersBitBoard), 
+            PARSER.parse_args())
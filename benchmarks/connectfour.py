@@ -0,0 +1,13 @@
+"""Compare games per second of ConnectFourBoard and ConnectFourBitBoard.
+
+python -m benchmarks.connectfour --games 1000
+
+"""
+from boards.connectfour import ConnectFourBoard, ConnectFourBitBoard
+from benchmarks.bench import get_parser, compare
+
+PARSER = get_parser('Benchmark connectfour boards.')
+
+if __name__ == '__main__':
+    compare('connectfour', (ConnectFourBoard, ConnectFourBitBoard),
+            PARSER.parse_args())
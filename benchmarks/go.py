@@ -0,0 +1,23 @@
+"""Compare random playouts per second of GoBoard and GoArrayBoard.
+
+python -m benchmarks.go --games 100
+
+GoBoard has been sped up since GoArrayBoard was added, so playouts are also
+timed against GoBoard as of BASELINE, checked out of git.
+
+"""
+from boards.go import GoBoard, GoArrayBoard
+from benchmarks.bench import get_parser, compare, compare_revision
+
+# last revision before GoArrayBoard
+BASELINE = 'e17646b'
+
+PARSER = get_parser('Benchmark go boards.')
+PARSER.set_defaults(games=100)
+PARSER.add_argument('--baseline', '-b', default=BASELINE,
+                    help='git revision of baseline GoBoard')
+
+if __name__ == '__main__':
+    args = PARSER.parse_args()
+    compare('go', (GoBoard, GoArrayBoard), args)
+    compare_revision(args.baseline, GoBoard, GoArrayBoard, args)
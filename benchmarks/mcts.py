@@ -0,0 +1,51 @@
+"""Compare playouts per second of MCTS and its parallel searches by workers.
+
+python -m benchmarks.mcts --game connectfour --playouts 20000 --workers 1 2 4
+
+"""
+import argparse
+import random
+import time
+
+from boards.boards import BOARDS
+from mcts.search import MCTS
+from mcts.parallel import RootParallelMCTS, TreeParallelMCTS
+
+PARSER = argparse.ArgumentParser(description='Benchmark parallel MCTS.')
+PARSER.add_argument('--game', default='connectfour',
+                    help='name of board searched from empty')
+PARSER.add_argument('--playouts', '-p', type=int, default=20000,
+                    help='playouts per search')
+PARSER.add_argument('--workers', '-w', type=int, nargs='+',
+                    default=[1, 2, 4], help='worker processes of each search')
+PARSER.add_argument('--seed', '-s', type=int, default=0,
+                    help='random seed')
+
+def rate(search, board, playouts):
+    """Return playouts per second of one search from board."""
+    # first search starts worker processes, not timed
+    search.search(board, playouts=max(1, playouts // 100))
+    start = time.perf_counter()
+    search.search(board, playouts=playouts)
+    return playouts / (time.perf_counter() - start)
+
+def scaling(name, args):
+    """Print playouts per second of each search, speedup over serial MCTS."""
+    board = BOARDS[name]()
+    random.seed(args.seed)
+    serial = rate(MCTS(), board, args.playouts)
+    print('{:<20}{:>8}{:>14.0f} playouts/s'.format('MCTS', 1, serial))
+    for cls in (RootParallelMCTS, TreeParallelMCTS):
+        for workers in args.workers:
+            random.seed(args.seed)
+            search = cls(workers)
+            try:
+                result = rate(search, board, args.playouts)
+            finally:
+                search.close()
+            print('{:<20}{:>8}{:>14.0f} playouts/s{:>8.2f}x'.format(
+                cls.__name__, workers, result, result / serial))
+
+if __name__ == '__main__':
+    args = PARSER.parse_args()
+    scaling(args.game, args)
@@ -29,8 +29,32 @@ def get_winners(size, slices):
             winners[x].append(tuple(y for y in ts if y != x))
     return tuple(tuple(slicess) for slicess in winners)
 
+HASH_SEED = 2718  # fixed seed, hash values agree across processes and runs
+
+def get_keys(num, *salt):
+    """Return random 64 bit ints drawn from HASH_SEED and salt.
+
+    Args
+    ----
+    num - int
+    salt - ints, distinguish tables drawn from same seed
+
+    Return
+    ------
+    tuple(int)
+
+    """
+    rng = np.random.default_rng((HASH_SEED,) + salt)
+    max_uint64 = np.iinfo(np.uint64).max
+    result = rng.integers(max_uint64 + 1, size=num, dtype=np.uint64)
+    # python ints, xor much faster than numpy scalars
+    return tuple(result.tolist())
+
 def get_hashes(num_pieces, size):
-    """Return array of size (num_pieces, size) of random uint64.
+    """Return table of shape (num_pieces, size) of random 64 bit ints.
+
+    Keys are seeded: same table for same shape in every process. Empty
+    piece 0 hashes to 0.
 
     Args
     ----
@@ -39,17 +63,113 @@ def get_hashes(num_pieces, size):
 
     Return
     ------
-    array - shape (num_pieces, size)
+    tuple(tuple(int)) - shape (num_pieces, size)
 
     """
-    rng = np.random.default_rng()
-    max_uint64 = np.iinfo(np.uint64).max
-    result = rng.integers(max_uint64 + 1, size=(num_pieces, size), 
-                             dtype=np.uint64) 
-    result[0] = 0
-    return result
+    keys = get_keys(num_pieces*size, num_pieces, size)
+    return ((0,)*size,) + tuple(keys[piece*size:(piece+1)*size] 
+                                for piece in range(1, num_pieces))
+
+MASK64 = (1 << 64) - 1
+
+# side to move agent2, last action a pass
+TURN_KEY, PASS_KEY = get_keys(2)
+
+# validation levels of append, pop, see Board.validation
+UNCHECKED, CHECKED, DEBUG = 0, 1, 2
+
+def square_symmetries(width):
+    """Return index maps of rigid motions of width x width board.
+
+    Identity, rotations, vertical and horizontal reflections, diagonal
+    reflections. Maps form a group: inverse of each map is a map.
+
+    Args
+    ----
+    width - int
+
+    Return
+    ------
+    tuple(tuple(int)) - shape (8, width**2), index i maps to result[k][i]
+
+    """
+    grid = np.arange(width * width).reshape(width, width)
+    motions = [grid]
+    motions.extend(np.rot90(grid, i) for i in range(1, 4))
+    motions.extend(np.flip(grid, i) for i in range(2))
+    motions.extend((grid.transpose(), np.rot90(grid, 2).transpose()))
+    return tuple(tuple(motion.flatten().tolist()) for motion in motions)
+
+def invert(symmetries):
+    """Return inverse of each index map."""
+    result = []
+    for perm in symmetries:
+        inverse = [0] * len(perm)
+        for i, j in enumerate(perm):
+            inverse[j] = i
+        result.append(tuple(inverse))
+    return tuple(result)
+
+def get_symm_keys(hashes, symmetries):
+    """Return hash keys of each piece at each index on symmetric boards.
+
+    Keys of all symmetries are packed into one int, 64 bits each, identity
+    lowest, so one xor updates the hashes of every symmetric board.
+
+    Args
+    ----
+    hashes - tuple(tuple(int)), as get_hashes
+    symmetries - tuple(tuple(int)), index maps, identity first
+
+    Return
+    ------
+    tuple(tuple(int)) - shape (num_pieces, size)
 
-BOARDS = {}
+    """
+    return tuple(tuple(sum(keys[perm[index]] << 64*k
+                           for k, perm in enumerate(symmetries))
+                       for index in range(len(keys)))
+                 for keys in hashes)
+
+# active features of all zero heuristic
+NO_FEATURES = (np.zeros(0, dtype=np.intp), None)
+
+def linear(weights, features):
+    """Return linear approx weights @ heuristic from active features.
+
+    Args
+    ----
+    weights - array
+    features - (array, array), indices, values or None if all 1
+
+    Return
+    ------
+    float
+
+    """
+    indices, values = features
+    if values is None:
+        return weights[indices].sum()
+    return weights[indices] @ values
+
+def add_features(delta, features, scale):
+    """Add scale * heuristic to delta in place from active features."""
+    indices, values = features
+    delta[indices] += scale if values is None else scale * values
+
+class Registry(dict):
+    """Dict of classes by name. Aliases resolve on lookup, not iterated."""
+
+    def __init__(self, aliases=None):
+        super().__init__()
+        self.aliases = {} if aliases is None else aliases  # alias : name
+
+    def __missing__(self, name):
+        if name in self.aliases:
+            return self[self.aliases[name]]
+        raise KeyError(name)
+
+BOARDS = Registry()
 
 def boards(name):
     """Decorator with arg name."""
@@ -65,7 +185,18 @@ class Board(ABC):
 
     _pieces = ()  # tuple of strs for each piece, called by __str__, __hash__
     _rows = ()    # tuple of slices, called by __repr__, __str__
-    _hashes = np.array((1,1), dtype=np.uint64)  # array of ints, called by append, pop
+    _hashes = ((0,),)  # table of ints, called by append, pop, rehash
+    _turn_key = TURN_KEY  # int, hashed when agent2 to move
+    _pass_key = PASS_KEY  # int, hashed when last action passed
+    validation = CHECKED  # level of checks in append, pop, play, undo
+    _symmetries = ()  # index maps, identity first, see canonical_hash
+    _symm_keys = ()  # keys of symmetric boards, see get_symm_keys
+    _action_symmetries = ()  # action maps matching _symmetries
+    _action_inverses = ()  # inverse action maps
+    _num_actions = 0  # size of fixed action space, see encode
+    _cache_attrs = ()  # attributes derived from board state, not state
+    _num_features = 19557  # length of heuristic, see heuristic
+    _zero_heuristic = False  # heuristic all zero, weights unused
 
     def __init__(self, size):
         """Construct board as flat array of length size.
@@ -79,7 +210,11 @@ class Board(ABC):
         # unsigned int < 256, numpy array very flexible
         self._board = np.zeros(size, dtype='uint8')
         self._actions = []
-        self._hash_value = self._hashes[0,0]
+        self._hash_value = 0
+        # piece hashes of board under each symmetry packed, see symm_hashes
+        self._symm_hash = 0
+        # reused by legal_mask
+        self._mask = np.zeros(self._num_actions, dtype=bool)
         self.winner = None
 
     @abstractmethod
@@ -129,17 +264,62 @@ class Board(ABC):
     def check_winner(self):
         """Determine if board is terminal (win, loss, or draw) or not."""
 
-    @abstractmethod
+    def encode(self, action):
+        """Return id of action in fixed action space range(_num_actions).
+
+        Int actions are their own ids.
+
+        Return
+        ------
+        int
+
+        """
+        return action
+
+    def decode(self, action_id):
+        """Return action of id. Inverse of encode."""
+        return action_id
+
+    def legal_mask(self):
+        """Return bool array over action ids, True if legal.
+
+        Same actions as legal_actions. The array is preallocated and reused
+        by later calls, copy to keep. Default fills it from legal_actions,
+        boards override to update it in append and pop.
+
+        Return
+        ------
+        array shape (_num_actions,)
+
+        """
+        mask = self._mask
+        mask[:] = False
+        mask[[self.encode(action) for action in self.legal_actions()]] = True
+        return mask
+
+    def action_ids(self):
+        """Return ids of actions played, replayed by decode in order."""
+        return [self.encode(action) for action in self._actions]
+
     def append(self, action):
         """Have current agent take action.
 
+        Asserts action is legal unless validation is UNCHECKED. At DEBUG,
+        also checks board consistency after, see check.
+
         Args
         ----
         action : tuple
 
         """
+        if self.validation:
+            assert self.legal(action), (
+                'illegal action by agent%d: %s\n%s' % (
+                self.turn(), action, self))
+        self._play(action)
+        if self.validation >= DEBUG:
+            self.check()
 
-    @abstractmethod
     def pop(self):
         """Undo last action. Return the action.
 
@@ -148,6 +328,44 @@ class Board(ABC):
         tuple
         
         """
+        action = self._undo()
+        if self.validation >= DEBUG:
+            self.check()
+        return action
+
+    def play(self, action):
+        """Have current agent take action from legal_actions.
+
+        Fast path of append for trusted callers, e.g. search. Checked only
+        at DEBUG.
+
+        """
+        if self.validation >= DEBUG:
+            self.append(action)
+        else:
+            self._play(action)
+
+    def undo(self):
+        """Undo last action, pair of play. Return the action."""
+        if self.validation >= DEBUG:
+            return self.pop()
+        return self._undo()
+
+    @abstractmethod
+    def _play(self, action):
+        """Have current agent take action without checks."""
+
+    @abstractmethod
+    def _undo(self):
+        """Undo last action without checks. Return the action."""
+
+    def check(self):
+        """Assert board is consistent. Called after append, pop at DEBUG.
+
+        Boards extend with checks of own structures.
+
+        """
+        self.check_hash()
 
     @abstractmethod
     def clear(self):
@@ -201,6 +419,103 @@ class Board(ABC):
         """Return hash value to place piece at index on board."""
         return cls._hashes[piece][index]
 
+    def _pass_hash(self, action):
+        """Return pass key if action flips whether last action passed.
+
+        Call before appending action, or after popping it.
+
+        """
+        passed = bool(self._actions) and self._actions[-1] is None
+        return self._pass_key if passed != (action is None) else 0
+
+    def _squares(self):
+        """Return piece at each index of board, as hashed by hash_calc."""
+        return self._board
+
+    def rehash(self):
+        """Return hash value computed from scratch.
+
+        Hash xors hash_calc of each piece, turn key if agent2 to move,
+        pass key if last action is None.
+
+        Return
+        ------
+        int
+
+        """
+        result = 0
+        for index, piece in enumerate(self._squares()):
+            result ^= self._hashes[piece][index]
+        if len(self) % 2:
+            result ^= self._turn_key
+        if self._actions and self._actions[-1] is None:
+            result ^= self._pass_key
+        return result
+
+    def check_hash(self):
+        """Assert incremental hash value equals hash from scratch.
+
+        Called by check after each append and pop at DEBUG.
+
+        """
+        assert self._hash_value == self.rehash(), (
+            'hash %d != rehash %d after %s' % (
+            self._hash_value, self.rehash(), self.info()))
+        assert self._symm_hash == self.symm_rehash(), (
+            'symmetric hashes differ from rehash after %s' % self.info())
+
+    def _symm_xor(self, piece, index):
+        """Xor piece at index into hash of each symmetric board."""
+        self._symm_hash ^= self._symm_keys[piece][index]
+
+    def symm_hashes(self):
+        """Return piece hash of board under each symmetry, identity first."""
+        value = self._symm_hash
+        return [value >> 64*k & MASK64 for k in range(len(self._symmetries))]
+
+    def symm_rehash(self):
+        """Return packed symmetric piece hashes computed from scratch."""
+        result = 0
+        if not self._symmetries:
+            return result
+        for index, piece in enumerate(self._squares()):
+            if piece:
+                result ^= self._symm_keys[piece][index]
+        return result
+
+    def canonical_hash(self):
+        """Return hash of least symmetric board. Same for symmetric boards.
+
+        Turn and pass keys as hash. Boards without symmetries return hash.
+
+        Return
+        ------
+        int
+
+        """
+        hashes = self.symm_hashes()
+        if not hashes:
+            return self._hash_value
+        # identity piece hash cancels out of hash value
+        return self._hash_value ^ hashes[0] ^ min(hashes)
+
+    def symmetry(self):
+        """Return index of symmetry mapping board to its canonical board."""
+        hashes = self.symm_hashes()
+        return hashes.index(min(hashes)) if hashes else 0
+
+    def map_action(self, action, symmetry):
+        """Return action on board mapped by symmetry. Passes are fixed."""
+        if action is None or not self._action_symmetries:
+            return action
+        return self._action_symmetries[symmetry][action]
+
+    def unmap_action(self, action, symmetry):
+        """Return action mapped to board by inverse of symmetry."""
+        if action is None or not self._action_inverses:
+            return action
+        return self._action_inverses[symmetry][action]
+
     def __hash__(self):
         """Return (nearly) unique value identifying board state.
 
@@ -209,7 +524,7 @@ class Board(ABC):
         int
 
         """
-        return int(self._hash_value)
+        return self._hash_value
 
     def __eq__(self, other):
         """Boards of equal hash are equal.
@@ -255,5 +570,66 @@ class Board(ABC):
 
     # @abstractmethod
     def heuristic(self):
-        """Return array of values of board properties for linear approx."""
+        """Return array of values of board properties for linear approx.
+
+        All zero, length _num_features, for boards with _zero_heuristic.
+
+        """
+        if self._zero_heuristic:
+            return np.zeros(self._num_features, dtype=np.bool)
         return np.array(self.board)
+
+    def active_features(self):
+        """Return indices, values of nonzero entries of heuristic.
+
+        Sparse heuristic: cost of linear approx, gradient step scales with
+        number of active features. Values are None if all are 1. Boards
+        override to skip the dense heuristic, none for _zero_heuristic.
+
+        Return
+        ------
+        (array, array) - indices increasing, values or None
+
+        """
+        if self._zero_heuristic:
+            return NO_FEATURES
+        heuristic = self.heuristic()
+        indices = np.flatnonzero(heuristic)
+        if heuristic.dtype == np.bool:
+            return indices, None
+        return indices, heuristic[indices]
+
+    def afterstate_heuristics(self, actions):
+        """Return heuristic of afterstate of each action, one row each.
+
+        Linear approx values of all afterstates are one matrix product,
+        afterstate_heuristics(actions) @ weights. Boards override with a
+        batched computation, default appends and pops each action.
+
+        Args
+        ----
+        actions - sequence of legal actions
+
+        Return
+        ------
+        array shape (len(actions), len(heuristic()))
+
+        """
+        if self._zero_heuristic:
+            return np.zeros((len(actions), self._num_features), dtype=np.bool)
+        result = []
+        for action in actions:
+            self.play(action)
+            result.append(self.heuristic())
+            self.undo()
+        return np.array(result)
+
+    def afterstate_values(self, actions, weights):
+        """Return linear approx value of afterstate of each action.
+
+        Boards with sparse heuristics override to index weights directly.
+
+        """
+        if self._zero_heuristic:
+            return np.zeros(len(actions))
+        return self.afterstate_heuristics(actions) @ weights
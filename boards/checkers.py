@@ -106,6 +106,111 @@ JUMPS_UP    = tuple(tuple(jumps) for jumps in JUMPS_UP)
 JUMPS_Down  = tuple(tuple(jumps) for jumps in JUMPS_DOWN)
 JUMPS       = tuple(tuple(jumps) for jumps in JUMPS)
 
+"""
+bits
+----
+[    0     1     2     3]
+[ 4     5     6     7   ]  8
+[    9    10    11    12]
+[13    14    15    16   ] 17
+[   18    19    20    21]
+[22    23    24    25   ] 26
+[   27    28    29    30]
+[31    32    33    34   ]
+
+bitboards pad every second row with an always empty ghost bit (8, 17, 26),
+so each diagonal direction is one constant shift: up/left >> 5, up/right 
+>> 4, down/left << 4, down/right << 5. Steps off the board land on a ghost
+bit or outside VALID.
+
+"""
+
+BITS = tuple(1 << (i + i//8) for i in range(32))  # bit mask of index
+INDICES = {bit.bit_length() - 1 : i for i, bit in enumerate(BITS)}
+VALID = sum(BITS)
+SHIFTS = (-5, -4, 4, 5)  # up/left, up/right, down/left, down/right
+
+for start, adj in enumerate(_EDGES):
+    for direc, stop in enumerate(adj):
+        if stop is not None:
+            shift = SHIFTS[direc]
+            assert BITS[stop] == (BITS[start] << shift if shift > 0 else
+                                  BITS[start] >> -shift)
+
+# slide action by piece and start*32 + stop
+SLIDE_TABLE = [None]
+for slides in (SLIDES_UP, SLIDES_DOWN, SLIDES, SLIDES):
+    table = [None]*1024
+    for start in range(32):
+        for slide in slides[start]:
+            table[start*32 + slide.stop] = slide
+    SLIDE_TABLE.append(tuple(table))
+SLIDE_TABLE = tuple(SLIDE_TABLE)
+
+# single jumps by piece and start in search order of CheckersBoard:
+# (capture bit, stop bit, jump with piece unset)
+HOP_TABLE = (None,) + tuple(
+    tuple(tuple((BITS[jump.capture], BITS[jump.stop], jump) 
+                for jump in jumps[start]) 
+          for start in range(32))
+    for jumps in (JUMPS_UP, JUMPS_DOWN, JUMPS, JUMPS))
+
+"""
+action ids
+----------
+slides - start*4 + direction, 0 to 127
+jumps  - 128 + start*4 + direction, 128 to 255
+paths  - 256 and up, numbered in order of PATH_IDS
+
+A path is its start and captures. PATH_IDS lists every start and sequence
+of two or more distinct captures the jump geometry allows, whatever the
+position, so ids of paths are fixed and the id space is bounded.
+
+"""
+
+SLIDE_IDS = {}  # (start, stop) : id
+JUMP_IDS = {}  # (start, capture) : id
+for start, adj in enumerate(_EDGES):
+    for direc, capture in enumerate(adj):
+        if capture is None:
+            continue
+        SLIDE_IDS[start, capture] = start*4 + direc
+        if _EDGES[capture][direc] is not None:
+            JUMP_IDS[start, capture] = 128 + start*4 + direc
+
+def _paths(captures, stop):
+    """Yield captures of paths extending captures, hops on from stop."""
+    for jump in JUMPS[stop]:
+        if jump.capture not in captures:
+            path = captures + (jump.capture,)
+            if len(path) > 1:
+                yield path
+            yield from _paths(path, jump.stop)
+
+PATH_IDS = {}  # (start, captures) : id
+for start in range(32):
+    for captures in _paths((), start):
+        PATH_IDS[start, captures] = 256 + len(PATH_IDS)
+NUM_IDS = 256 + len(PATH_IDS)
+
+def encode(action):
+    """Return id of action in range(NUM_IDS), see action ids.
+
+    Args
+    ----
+    action - Slide, Jump or Path
+
+    Return
+    ------
+    int
+
+    """
+    if isinstance(action, Slide):
+        return SLIDE_IDS[action.start, action.stop]
+    if isinstance(action, Jump):
+        return JUMP_IDS[action.start, action.capture]
+    return PATH_IDS[action.start, action.captures]
+
 del _EDGES
 
 @boards('checkers')
@@ -117,6 +222,10 @@ class CheckersBoard(Board):
 
     _slides = (None, SLIDES_UP, SLIDES_DOWN, SLIDES, SLIDES)
     _jumps = (None, JUMPS_UP, JUMPS_DOWN, JUMPS, JUMPS)
+    _num_actions = NUM_IDS  # see encode
+    _zero_heuristic = True  # TODO: actual heuristic
+    _cache_attrs = ('_cache', '_cache_key', 'cache_hits', 'cache_misses',
+                    '_mask', '_mask_key', '_mask_ids')
 
     def __init__(self):
         super().__init__(32)
@@ -127,6 +236,14 @@ class CheckersBoard(Board):
         for i in range(0, 12):
             self._add_piece(2, i)
         self._start_hash_value = self._hash_value
+        # legal actions of ply, hash of _cache_key, see legal_actions
+        self._cache = ()
+        self._cache_key = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # ply, hash of legal mask and ids set in it, see legal_mask
+        self._mask_key = None
+        self._mask_ids = []
 
     def _legal_slides(self):
         """Return list of legal jumps."""
@@ -163,11 +280,6 @@ class CheckersBoard(Board):
         self._del_piece_paths(jump.capture) 
 
         self._actions.append(jump)
-
-        for piece in range(1, 5):
-            for index in self._indices[piece]:
-                assert self._board[index] == piece
-
         return jump
          
     def _pop_paths(self): 
@@ -226,59 +338,90 @@ class CheckersBoard(Board):
     def _legal_jumps(self):
         """Return list of legal jumps."""
         trn = self.turn()
+        # copy indices, _legal_paths moves pieces while iterating
         return tuple(action
                      for piece in (trn, trn+2)
-                     for index in self._indices[piece]
+                     for index in tuple(self._indices[piece])
                      for jump in self._jumps[piece][index]
                      for action in self._legal_paths(jump))
                           
     def legal_actions(self):
-        """Return all legal jumps and paths. If none, return legal slides."""
-        return self._legal_jumps() or self._legal_slides()
-         
-    def _legal_slide(self, slide):
-        """Return True if slide is a legal action."""
-        # next position must be empty
-        if self._board[slide.stop]:
-            return False
-        trn = self.turn()
-        piece = self._board[slide.start]
-        return ((piece == trn and bool(trn - 1) != slide.up) or 
-                (piece - 2 == trn))
+        """Return all legal jumps and paths. If none, return legal slides.
 
-    def _legal_jump(self, jump):
-        """Return True if jump is a legal action."""
-        oth = self.other()
-        return (self._board[jump.capture] in (oth, oth+2) and
-                self._legal_slide(jump))
+        Cached for current ply and hash, shared by legal and later calls.
+
+        """
+        key = (len(self._actions), self._hash_value)
+        if self._cache_key == key:
+            self.cache_hits += 1
+            return self._cache
+        self.cache_misses += 1
+        self._cache = self._legal_jumps() or self._legal_slides()
+        self._cache_key = key
+        return self._cache
 
-    def _legal_path(self, path):
-        """Return True if path is a legal action."""
+    def _can_move(self):
+        """Return True if current agent has any legal action.
+
+        Stops at first slide or jump found, paths need not be generated.
+
+        """
+        if self._cache_key == (len(self._actions), self._hash_value):
+            self.cache_hits += 1
+            return bool(self._cache)
         trn = self.turn()
         oth = self.other()
-        return (all(self._board[capture] in (oth, oth+2)
-                    for capture in path.captures) and
-                all(self._board[capture] == piece for capture, piece 
-                    in zip(path.captures, path.pieces)) and
-                (not self._board[path.stop] or path.start == path.stop) and
-                self._board[path.start] in (trn, trn+2))
+        board = self._board
+        for piece in (trn, trn+2):
+            for index in self._indices[piece]:
+                for slide in self._slides[piece][index]:
+                    if not board[slide.stop]:
+                        return True
+                for jump in self._jumps[piece][index]:
+                    if (board[jump.capture] in (oth, oth+2) and
+                        not board[jump.stop]):
+                        return True
+        return False
+
+    def cache_info(self):
+        """Return legal actions cache counters string for logger."""
+        return 'CACHE HITS: {}\tMISSES: {}'.format(self.cache_hits,
+                                                  self.cache_misses)
 
     def legal(self, action):
-        """Return True if aciton is legal."""
-        if action is None:
-            return False
-        if isinstance(action, Jump):
-            return self._legal_jump(action)
-        if isinstance(action, Path):
-            return self._legal_path(action)
-        return not self._legal_jumps() and self._legal_slide(action)
+        """Return True if action is legal. Uses legal actions cache."""
+        return action in self.legal_actions()
+
+    def encode(self, action):
+        return encode(action)
+
+    def decode(self, action_id):
+        """Return legal action of id. Raise ValueError if none."""
+        for action in self.legal_actions():
+            if encode(action) == action_id:
+                return action
+        raise ValueError('no legal action of id %d' % action_id)
+
+    def legal_mask(self):
+        """Return mask of ids of legal actions. Reused, copy to keep.
+
+        Updated once per ply and hash: unsets the ids of the last legal
+        actions and sets the current ones, the mask is never cleared whole.
+
+        """
+        key = (len(self._actions), self._hash_value)
+        if self._mask_key != key:
+            mask = self._mask
+            mask[self._mask_ids] = False
+            self._mask_ids = [encode(action)
+                              for action in self.legal_actions()]
+            mask[self._mask_ids] = True
+            self._mask_key = key
+        return self._mask
 
-    # TODO _check_winner, _legal, _turn, _other, _hash_calc
     def check_winner(self):
-        if not self.legal_actions():
+        if not self._can_move():
             self.winner = self.other()
-        # TODO optimizations: False when moves < 20
-        #                     yield legal actions
 
     def _add_piece(self, piece, index):
         """Update board, hash, indices with added piece."""
@@ -293,9 +436,7 @@ class CheckersBoard(Board):
         self._hash_value ^= self.hash_calc(piece, index)
         self._indices[piece].remove(index)
 
-    def append(self, action):
-        assert self.legal(action), (
-            'illegal action by agent%d: %s\n%s' % (self.turn(), action, self))
+    def _play(self, action):
         # cache start piece before deleted
         piece = self._board[action.start]
 
@@ -310,24 +451,16 @@ class CheckersBoard(Board):
 
         # capture
         if isinstance(action, Jump):
-            assert action.piece == self._board[action.capture], (action.piece, self._board[action.capture], action, self)
-            # action = action._replace(piece=self._board[action.capture])
             self._del_piece(action.capture)
         elif isinstance(action, Path):
-            for piece, capture in zip(action.pieces, action.captures):
-                assert piece == self._board[capture], (piece, self._board[capture])
             for capture in action.captures:
                 self._del_piece(capture) 
             
+        self._hash_value ^= self._turn_key
         self._actions.append(action)
         self.check_winner()
-
-        # print('Indices: %s' % str(self._indices))
-        for piece in range(1, 5):
-            for index in self._indices[piece]:
-                assert self._board[index] == piece
          
-    def pop(self): 
+    def _undo(self):
         self.winner = None
         action = self._actions.pop() 
 
@@ -347,14 +480,30 @@ class CheckersBoard(Board):
             piece -= 2
         self._add_piece(piece, action.start)
 
+        self._hash_value ^= self._turn_key
+        self._cache_key = None
         return action
 
+    def check(self):
+        """Also assert indices agree with board, cache with generation."""
+        super().check()
+        for piece in range(1, 5):
+            for index in self._indices[piece]:
+                assert self._board[index] == piece, (
+                    'index %d not piece %d after %s' % (
+                    index, piece, self.info()))
+        if self._cache_key == (len(self._actions), self._hash_value):
+            assert self._cache == (self._legal_jumps() or
+                                   self._legal_slides()), (
+                'cached legal actions differ after %s' % self.info())
+
     def clear(self):
         self._board[:] = [2]*12 + [0]*8 + [1]*12
         self._actions.clear()
         self._indices = (None, set(range(20, 32)), set(range(0, 12)),
                          set(), set())
         self._hash_value = self._start_hash_value
+        self._cache_key = None
         self.winner = None 
 
     def __str__(self):
@@ -405,8 +554,287 @@ class CheckersBoard(Board):
             capture = action.captures
         return (action.start, action.stop, capture)
 
-    # agent interface
+def _indices(mask):
+    """Yield board indices of set bits in increasing order."""
+    while mask:
+        low = mask & -mask
+        yield INDICES[low.bit_length() - 1]
+        mask ^= low
+
+class CheckersBitBoard(Board):
+    """CheckersBoard backend on 32 square bitboards.
+
+    Each agent has a mask of pieces, kings share one mask. Slides and first
+    jumps are generated for all pieces at once with masked shifts, jump
+    chains are expanded one hop at a time from the masks without touching
+    the position. Emits the same Slide, Jump and Path actions, winners,
+    info and hash values as CheckersBoard.
+
+    """
+
+    _pieces = PIECES  # strs
+    _rows = ROWS  # slices
+    _hashes = HASHES  # ints, shared with CheckersBoard
+
+    _action_str = CheckersBoard._action_str
+    _num_actions = NUM_IDS  # see encode
+    _zero_heuristic = True  # TODO: actual heuristic
+    _cache_attrs = ('_mask', '_mask_key', '_mask_ids')
+    encode = CheckersBoard.encode
+    decode = CheckersBoard.decode
+    legal_mask = CheckersBoard.legal_mask
+
+    def __init__(self):
+        super().__init__(32)
+        # position lives in _colors and _kings, see _grid
+        self._board = None
+        self._colors = [0, 0, 0]  # unused, agent1, agent2
+        self._kings = 0
+        for i in range(20, 32):
+            self._add_piece(1, i)
+        for i in range(0, 12):
+            self._add_piece(2, i)
+        self._start_colors = tuple(self._colors)
+        self._start_hash_value = self._hash_value
+        # ply, hash of legal mask and ids set in it, see legal_mask
+        self._mask_key = None
+        self._mask_ids = []
+
+    def _piece(self, index):
+        """Return piece at index: 0 empty, 1 or 2 man, 3 or 4 king."""
+        bit = BITS[index]
+        if self._colors[1] & bit:
+            piece = 1
+        elif self._colors[2] & bit:
+            piece = 2
+        else:
+            return 0
+        return piece + 2 if self._kings & bit else piece
+
+    def _add_piece(self, piece, index):
+        """Update masks, hash with added piece."""
+        bit = BITS[index]
+        self._colors[2 - piece % 2] |= bit
+        if piece > 2:
+            self._kings |= bit
+        self._hash_value ^= self.hash_calc(piece, index)
+
+    def _del_piece(self, index):
+        """Update masks, hash with removed piece. Return the piece."""
+        piece = self._piece(index)
+        bit = ~BITS[index]
+        self._colors[2 - piece % 2] &= bit
+        self._kings &= bit
+        self._hash_value ^= self.hash_calc(piece, index)
+        return piece
+
+    def _masks(self):
+        """Return masks of current agent's pieces moving up, down, empty."""
+        trn = self.turn()
+        pieces = self._colors[trn]
+        kings = pieces & self._kings
+        empty = VALID & ~(self._colors[1] | self._colors[2])
+        if trn == 1:
+            return pieces, kings, empty
+        return kings, pieces, empty
+
+    def _legal_slides(self):
+        """Return tuple of legal slides."""
+        trn = self.turn()
+        up, down, empty = self._masks()
+        kings = self._kings
+        result = []
+        for shift in (5, 4):
+            for stop in _indices((up >> shift) & empty):
+                start = INDICES[(BITS[stop] << shift).bit_length() - 1]
+                piece = trn + 2 if kings & BITS[start] else trn
+                result.append(SLIDE_TABLE[piece][start*32 + stop])
+            for stop in _indices((down << shift) & empty):
+                start = INDICES[(BITS[stop] >> shift).bit_length() - 1]
+                piece = trn + 2 if kings & BITS[start] else trn
+                result.append(SLIDE_TABLE[piece][start*32 + stop])
+        return tuple(result)
+
+    def _jumpers(self):
+        """Return mask of current agent's pieces with a first jump."""
+        up, down, empty = self._masks()
+        opponents = self._colors[self.other()]
+        result = 0
+        for shift in (5, 4):
+            if up:
+                stops = (((up >> shift) & opponents) >> shift) & empty
+                result |= stops << 2*shift
+            if down:
+                stops = (((down << shift) & opponents) << shift) & empty
+                result |= stops >> 2*shift
+        return result
+
+    def _legal_paths(self, piece, start):
+        """Return jumps and paths starting at start. DFS over the masks.
 
-    def heuristic(self):
-        # TODO: actual heuristic
-        return np.zeros(19557, dtype=np.bool)
+        As CheckersBoard, a first jump with no continuation is a Jump, every
+        chain of hops following a first jump is a Path.
+
+        """
+        oth = self.other()
+        kings = self._kings
+
+        def explore(piece, index, opponents, empty, hops, paths):
+            """Extend hops from index. Captures leave empty squares."""
+            extended = False
+            for capture_bit, stop_bit, jump in HOP_TABLE[piece][index]:
+                if capture_bit & opponents and stop_bit & empty:
+                    extended = True
+                    captured = oth + 2 if kings & capture_bit else oth
+                    hops.append((jump, captured))
+                    explore(piece + 2 if jump.promotion else piece, 
+                            jump.stop, opponents ^ capture_bit,
+                            (empty | capture_bit | BITS[index]) ^ stop_bit, 
+                            hops, paths)
+                    hops.pop()
+            if not extended:
+                paths.append(tuple(hops))
+
+        opponents = self._colors[oth]
+        empty = VALID & ~(self._colors[1] | self._colors[2])
+        result = []
+        for capture_bit, stop_bit, jump in HOP_TABLE[piece][start]:
+            if not (capture_bit & opponents and stop_bit & empty):
+                continue
+            captured = oth + 2 if kings & capture_bit else oth
+            paths = []
+            explore(piece + 2 if jump.promotion else piece, jump.stop, 
+                    opponents ^ capture_bit, 
+                    (empty | capture_bit | BITS[start]) ^ stop_bit,
+                    [(jump, captured)], paths)
+
+            if len(paths) == 1 and len(paths[0]) == 1:
+                result.append(jump._replace(piece=captured))
+                continue
+
+            result.extend(Path(start, path[-1][0].stop, 
+                               any(jump.promotion for jump, _ in path),
+                               tuple(jump.capture for jump, _ in path),
+                               tuple(captured for _, captured in path))
+                          for path in paths)
+        return result
+
+    def _legal_jumps(self):
+        """Return tuple of legal jumps and paths."""
+        jumpers = self._jumpers()
+        if not jumpers:
+            return ()
+        trn = self.turn()
+        kings = self._kings
+        return tuple(action 
+                     for start in _indices(jumpers)
+                     for action in self._legal_paths(
+                         trn + 2 if kings & BITS[start] else trn, start))
+
+    def legal_actions(self):
+        """Return all legal jumps and paths. If none, return legal slides."""
+        return self._legal_jumps() or self._legal_slides()
+
+    def legal(self, action):
+        """Return True if action is legal. Generates moves of one piece."""
+        if not isinstance(action, (Slide, Jump, Path)):
+            return False
+        piece = self._piece(action.start)
+        if not piece or 2 - piece % 2 != self.turn():
+            return False
+        if isinstance(action, Slide):
+            occupied = self._colors[1] | self._colors[2]
+            return (not occupied & BITS[action.stop] and
+                    not self._jumpers() and
+                    SLIDE_TABLE[piece][action.start*32 + action.stop] == 
+                    action)
+        return action in self._legal_paths(piece, action.start)
+
+    def _can_move(self):
+        """Return True if current agent has any legal action."""
+        up, down, empty = self._masks()
+        return bool(((up >> 4) | (up >> 5) | (down << 4) | (down << 5)) 
+                    & empty or self._jumpers())
+
+    def check_winner(self):
+        if not self._can_move():
+            self.winner = self.other()
+
+    def _play(self, action):
+        # remove start first since stop may equal start
+        piece = self._del_piece(action.start)
+        if action.promotion:
+            piece += 2
+        self._add_piece(piece, action.stop)
+
+        # capture
+        if isinstance(action, Jump):
+            self._del_piece(action.capture)
+        elif isinstance(action, Path):
+            for capture in action.captures:
+                self._del_piece(capture)
+
+        self._hash_value ^= self._turn_key
+        self._actions.append(action)
+        self.check_winner()
+
+    def _undo(self):
+        self.winner = None
+        action = self._actions.pop()
+
+        # capture
+        if isinstance(action, Jump):
+            self._add_piece(action.piece, action.capture)
+        elif isinstance(action, Path):
+            for piece, capture in zip(action.pieces, action.captures):
+                self._add_piece(piece, capture)
+
+        # stop, start
+        piece = self._del_piece(action.stop)
+        if action.promotion:
+            piece -= 2
+        self._add_piece(piece, action.start)
+
+        self._hash_value ^= self._turn_key
+        return action
+
+    def clear(self):
+        self._actions.clear()
+        self._colors = list(self._start_colors)
+        self._kings = 0
+        self._hash_value = self._start_hash_value
+        self.winner = None
+
+    def _grid(self):
+        """Return flat array of pieces indexed as CheckersBoard._board."""
+        return np.array([self._piece(i) for i in range(32)], dtype='uint8')
+
+    def _squares(self):
+        return self._grid()
+
+    def __repr__(self):
+        grid = self._grid()
+        return '\n'.join(str(grid[row]) for row in self._rows)
+
+    def __str__(self):
+        grid = self._grid()
+        result = '/'*21 + '\n'
+        even = True
+        for row in self._rows:
+            line = '// '
+            if even:
+                line += ' '.join('  ' + self._pieces[actn] 
+                                 for actn in grid[row])
+            else:
+                line += ' '.join(self._pieces[actn] + '  '
+                                 for actn in grid[row])
+            even = not even
+            line += ' //'
+            result += line + '\n'
+        result += '/'*21
+        return result
+
+    # logger interface
+
+    def info(self):
+        return [self._action_str(action) for action in self]
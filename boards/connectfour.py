@@ -1,6 +1,7 @@
 import numpy as np
 
-from boards.board import get_winners, get_hashes, boards, Board
+from boards.board import (get_winners, get_hashes, get_symm_keys, boards,
+                          Board)
 
 """
 indices
@@ -33,6 +34,10 @@ for i in range(0, 21, 7):
     
 WINNERS = get_winners(42, _SLICES)
 HASHES = get_hashes(3, 42)
+# identity, left-right mirror
+SYMMETRIES = (tuple(range(42)), tuple(i + 6 - 2*(i%7) for i in range(42)))
+SYMM_KEYS = get_symm_keys(HASHES, SYMMETRIES)
+ACTION_SYMMETRIES = (tuple(range(7)), tuple(range(6, -1, -1)))
 
 del _SLICES
 
@@ -43,11 +48,18 @@ class ConnectFourBoard(Board):
     _rows = ROWS  # slices
     _winners = WINNERS  # tuples
     _hashes = HASHES  # ints
+    _symmetries = SYMMETRIES  # index maps
+    _symm_keys = SYMM_KEYS  # ints
+    _action_symmetries = ACTION_SYMMETRIES  # column maps
+    _action_inverses = ACTION_SYMMETRIES  # mirror is own inverse
+    _num_actions = 7  # columns
+    _zero_heuristic = True  # TODO: actual heuristic
 
     def __init__(self):
         super().__init__(42)
         self._legal_actions = [list(range(i, -1, -7)) for i in range(35, 42)]
         self._indices = []
+        self._mask[:] = True
 
     def legal_actions(self):
         return tuple(i for i in range(7) if self._legal_actions[i])
@@ -55,6 +67,9 @@ class ConnectFourBoard(Board):
     def legal(self, action):
         return bool(self._legal_actions[action])
 
+    def legal_mask(self):
+        return self._mask
+
     def check_winner(self):
         # agent takes at least 4 turns to win 
         if len(self) < 7:
@@ -65,34 +80,38 @@ class ConnectFourBoard(Board):
         for slc in self._winners[self._indices[-1]]:
             if all(self._board[i] == oth for i in slc):
                 self.winner = oth
-                break
+                return
 
         # full board without winner is draw
         if len(self) == 42:
             self.winner = 0
 
-    def append(self, action):
-        assert self.legal(action), (
-            'illegal action by agent%d' % (self.turn()) + repr(self),)
+    def _play(self, action):
         trn = self.turn()
         ind = self._legal_actions[action].pop()
+        if not self._legal_actions[action]:
+            self._mask[action] = False
         self._board[ind] = trn
         # turn depends on number of moves
         # increment hash value before appending to actions
-        self._hash_value ^= self.hash_calc(trn, ind)
+        self._hash_value ^= self.hash_calc(trn, ind) ^ self._turn_key
+        self._symm_xor(trn, ind)
         self._actions.append(action)
         self._indices.append(ind)
         self.check_winner()
 
-    def pop(self):
+    def _undo(self):
         action = self._actions.pop()
         index = self._indices.pop()
         self._board[index] = 0
         self._legal_actions[action].append(index)
+        self._mask[action] = True
         self.winner = None
         # turn depends on number of moves
         # decrement hash value after popping from actions
-        self._hash_value ^= self.hash_calc(self.turn(), index)
+        trn = self.turn()
+        self._hash_value ^= self.hash_calc(trn, index) ^ self._turn_key
+        self._symm_xor(trn, index)
         return action
 
     def clear(self):
@@ -100,7 +119,9 @@ class ConnectFourBoard(Board):
         self._actions.clear()
         self._indices.clear()
         self._legal_actions = [list(range(i, -1, -7)) for i in range(35, 42)]
-        self._hash_value = self._hashes[0,0]
+        self._mask[:] = True
+        self._hash_value = 0
+        self._symm_hash = 0
         self.winner = None
 
     def __str__(self):
@@ -132,8 +153,165 @@ class ConnectFourBoard(Board):
     def info(self):
         return self._indices
 
-    # agent interface
+"""
+bits
+----
+[ 5 12 19 26 33 40 47]
+[ 4 11 18 25 32 39 46]
+[ 3 10 17 24 31 38 45]
+[ 2  9 16 23 30 37 44]
+[ 1  8 15 22 29 36 43]
+[ 0  7 14 21 28 35 42]
+
+each column has a sentinel bit on top (6, 13, ..., 48), always zero, so 
+shifts never carry a line from one column into the next.
+
+"""
+
+HEIGHT = 7  # bits per column: 6 rows + sentinel
+BOTTOMS = tuple(HEIGHT*j for j in range(7))
+TOPS = tuple(bottom + 6 for bottom in BOTTOMS)
+# vertical, horizontal, diagonal /, diagonal \
+SHIFTS = (1, HEIGHT, HEIGHT+1, HEIGHT-1)
+
+class ConnectFourBitBoard(Board):
+    """ConnectFourBoard backend on two bitboards plus column heights.
+
+    Drop-in replacement: same actions, winner, info and hash values as
+    ConnectFourBoard. Position is kept in one int per agent, wins are found
+    by shift-and-mask in constant time.
+
+    """
+
+    _pieces = PIECES  # strs
+    _rows = ROWS  # slices
+    _hashes = HASHES  # ints, shared with ConnectFourBoard
+    _symmetries = SYMMETRIES  # index maps
+    _symm_keys = SYMM_KEYS  # ints
+    _action_symmetries = ACTION_SYMMETRIES  # column maps
+    _action_inverses = ACTION_SYMMETRIES  # mirror is own inverse
+    _num_actions = 7  # columns
+    _zero_heuristic = True  # TODO: actual heuristic
+
+    def __init__(self):
+        super().__init__(42)
+        self._mask[:] = True
+        # position lives in _bits, see _grid
+        self._board = None
+        self._bits = [0, 0, 0]  # unused, agent1, agent2
+        self._heights = list(BOTTOMS)  # next free bit in each column
+        self._legal_actions = tuple(range(7))  # changes when column fills
+
+    def _update_legal_actions(self):
+        heights = self._heights
+        self._legal_actions = tuple(j for j in range(7) 
+                                    if heights[j] != TOPS[j])
+        for j in range(7):
+            self._mask[j] = heights[j] != TOPS[j]
+
+    def legal_actions(self):
+        return self._legal_actions
+
+    def legal(self, action):
+        return 0 <= action < 7 and self._heights[action] != TOPS[action]
+
+    def legal_mask(self):
+        return self._mask
+
+    def check_winner(self):
+        # agent takes at least 4 turns to win 
+        if len(self) < 7:
+            return
+
+        # last agent to take turn can win
+        bits = self._bits[self.other()]
+        for shift in SHIFTS:
+            pairs = bits & (bits >> shift)
+            if pairs & (pairs >> 2*shift):
+                self.winner = self.other()
+                return
+
+        # full board without winner is draw
+        if len(self) == 42:
+            self.winner = 0
+
+    def _play(self, action):
+        trn = self.turn()
+        bit = self._heights[action]
+        self._heights[action] = bit + 1
+        if bit + 1 == TOPS[action]:
+            self._update_legal_actions()
+        self._bits[trn] |= 1 << bit
+        # turn depends on number of moves
+        # increment hash value before appending to actions
+        index = (bit - BOTTOMS[action])*7 + action
+        self._hash_value ^= self.hash_calc(trn, index) ^ self._turn_key
+        self._symm_xor(trn, index)
+        self._actions.append(action)
+        self.check_winner()
+
+    def _undo(self):
+        action = self._actions.pop()
+        bit = self._heights[action] - 1
+        self._heights[action] = bit
+        if bit + 1 == TOPS[action]:
+            self._update_legal_actions()
+        self.winner = None
+        # turn depends on number of moves
+        # decrement hash value after popping from actions
+        trn = self.turn()
+        self._bits[trn] ^= 1 << bit
+        index = (bit - BOTTOMS[action])*7 + action
+        self._hash_value ^= self.hash_calc(trn, index) ^ self._turn_key
+        self._symm_xor(trn, index)
+        return action
+
+    def clear(self):
+        self._actions.clear()
+        self._bits = [0, 0, 0]
+        self._heights = list(BOTTOMS)
+        self._legal_actions = tuple(range(7))
+        self._mask[:] = True
+        self._hash_value = 0
+        self._symm_hash = 0
+        self.winner = None
 
-    def heuristic(self):
-        # TODO: actual heuristic
-        return np.zeros(19557, dtype=np.bool)
+    def _grid(self):
+        """Return flat array of pieces indexed as ConnectFourBoard._board."""
+        result = np.zeros((6, 7), dtype='uint8')
+        for piece in (1, 2):
+            bits = np.frombuffer(self._bits[piece].to_bytes(7, 'little'),
+                                 dtype='uint8')
+            # columns of 7 bits, drop sentinel row, transpose to rows
+            bits = np.unpackbits(bits, bitorder='little')[:49]
+            result += piece * bits.reshape(7, 7)[:, :6].T
+        return result.flatten()
+
+    def _squares(self):
+        return self._grid()
+
+    def __repr__(self):
+        grid = self._grid()
+        return '\n'.join(str(grid[row]) for row in self._rows)
+
+    def __str__(self):
+        grid = self._grid()
+        result = '/'*19 + '\n'
+        for row in self._rows:
+            line = '// '
+            line += ' '.join(self._pieces[actn] for actn in grid[row])
+            line += ' //'
+            result += line + '\n'
+        result += '/'*19
+        return result
+
+    # logger interface
+
+    def info(self):
+        """Return board indices of actions, as ConnectFourBoard.info."""
+        heights = [0]*7
+        result = []
+        for action in self._actions:
+            result.append(heights[action]*7 + action)
+            heights[action] += 1
+        return result
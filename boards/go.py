@@ -1,7 +1,9 @@
 import numpy as np
 from collections import namedtuple, defaultdict
+from functools import lru_cache
 
-from boards.board import get_winners, get_hashes, boards, Board
+from boards.board import (get_winners, get_hashes, square_symmetries, invert,
+                          get_symm_keys, boards, Board, BOARDS)
 from utils.disjointset import DisjointSet
 
 """
@@ -12,26 +14,50 @@ indices
 ...
 [63 64 65 66 67 68 69 70 71]
 [72 73 74 75 76 77 78 79 80]
+
+boards of width w index points row by row from 0 to w*w - 1
 """
 
 PIECES = ('.', 'x', 'o')
-ROWS = tuple(slice(i, i+9) for i in range(0, 81, 9))
-HASHES = get_hashes(3, 81)
-
-ADJS = [[i-9, i-1, i+1, i+9] for i in range(81)]
-for i in range(1, 8):
-    ADJS[i].pop(0)
-for i in range(9, 72, 9):
-    ADJS[i].pop(1)
-for i in range(17, 80, 9):
-    ADJS[i].pop(2)
-for i in range(73, 80):
-    ADJS[i].pop(3)
-ADJS[0] = [1, 9]
-ADJS[8] = [7, 17]
-ADJS[72] = [63, 73]
-ADJS[80] = [71, 79]
-ADJS = tuple(tuple(x) for x in ADJS)
+Geometry = namedtuple('Geometry', 'rows adjs hashes symmetries symm_keys')
+
+@lru_cache(maxsize=None)
+def get_geometry(width):
+    """Return rows, adjacent points, hashes, symmetries of width x width board.
+
+    Tables are built once per width and shared by every board of that size.
+
+    Args
+    ----
+    width - int
+
+    Return
+    ------
+    Geometry(tuple(slice), tuple(tuple(int)), tuple(tuple(int)),
+             tuple(tuple(int)), tuple(tuple(tuple(int))))
+
+    """
+    size = width * width
+    rows = tuple(slice(i, i+width) for i in range(0, size, width))
+    adjs = []
+    for i in range(size):
+        row, col = divmod(i, width)
+        adj = []
+        if row > 0:
+            adj.append(i-width)
+        if col > 0:
+            adj.append(i-1)
+        if col < width-1:
+            adj.append(i+1)
+        if row < width-1:
+            adj.append(i+width)
+        adjs.append(tuple(adj))
+    hashes = get_hashes(3, size)
+    symmetries = square_symmetries(width)
+    return Geometry(rows, tuple(adjs), hashes, symmetries,
+                    get_symm_keys(hashes, symmetries))
+
+ROWS, ADJS, HASHES, SYMMETRIES, SYMM_KEYS = get_geometry(9)
 
 # actions
 Action = namedtuple('Action', 'action adjs join captures')
@@ -39,6 +65,95 @@ Capture = namedtuple('Capture',
     'turn, indices, components, liberties, captors, boundaries')
 Join = namedtuple('Join', 'friends component liberty')
 
+def territory(board, adjs):
+    """Return score of captured empty components. Reference for area.
+
+    Args
+    ----
+    board - sequence of ints, color of each point
+    adjs - tuple(tuple(int)), adjacent points of each point
+
+    Return
+    ------
+    array - shape (3,), empty points surrounded by agent1 and agent2
+
+    """
+    score = np.zeros(3)
+
+    # depth first search, explicit stac
+    visited = np.array(board, dtype='bool')
+    for i in range(len(board)):
+        if visited[i]:
+            continue
+        
+        stack = [i]
+        component = set()
+        threats1 = False
+        threats2 = False
+
+        while stack:
+            j = stack.pop()
+            if visited[j]:
+                continue
+            visited[j] = True
+            component.add(j)
+           
+            for adj in adjs[j]:
+                if board[adj] == 1:
+                    threats1 = True 
+                elif board[adj] == 2:
+                    threats2 = True 
+                elif not visited[adj]:
+                    stack.append(adj) 
+
+        if threats1 and not threats2:
+            score[1] += len(component) 
+        elif threats2 and not threats1:
+            score[2] += len(component) 
+        
+    return score
+
+def area(board, adjs, empties, counts):
+    """Return area score: stones plus captured empty components.
+
+    Only empty points are flooded, each once. Same territory as territory.
+
+    Args
+    ----
+    board - list(int), color of each point
+    adjs - tuple(tuple(int)), adjacent points of each point
+    empties - iterable(int), every empty point
+    counts - sequence(int), stone count of each color
+
+    Return
+    ------
+    list(int) - [0, area of agent1, area of agent2]
+
+    """
+    score = [0, counts[1], counts[2]]
+    visited = bytearray(len(board))
+    for i in empties:
+        if visited[i]:
+            continue
+        visited[i] = 1
+        stack = [i]
+        size = 0
+        # bit flags of colors bordering component
+        threats = 0
+        while stack:
+            j = stack.pop()
+            size += 1
+            for adj in adjs[j]:
+                color = board[adj]
+                if color:
+                    threats |= color
+                elif not visited[adj]:
+                    visited[adj] = 1
+                    stack.append(adj)
+        if threats == 1 or threats == 2:
+            score[threats] += size
+    return score
+
 # adj: array map from index to adjacent indices
 # board: array map from index to color
 # groups: disjoint set map from index to root
@@ -58,26 +173,42 @@ Join = namedtuple('Join', 'friends component liberty')
 class GoBoard(Board):
 
     _pieces = PIECES  # strs
+    _width = 9  # points per row, see sized
     _rows = ROWS  # slices
     _hashes = HASHES  # ints
     _adjs = ADJS # ints
+    _symmetries = SYMMETRIES  # index maps
+    _symm_keys = SYMM_KEYS  # ints
+    _action_symmetries = SYMMETRIES  # index maps, passes fixed
+    _action_inverses = invert(SYMMETRIES)  # index maps
+    _num_actions = 82  # points, pass last
+    _zero_heuristic = True  # TODO: actual heuristic
 
     def __init__(self):
-        super().__init__(81)
-        self._legal_actions = set(range(81)) | {None}
-        self._groups = DisjointSet(81)
-        self._components = [{i} for i in range(81)]
+        super().__init__(self._width**2)
+        self._legal_actions = set(range(self._size)) | {None}
+        self._mask[:] = True  # empty points, pass last
+        self._masked_ko = -1  # point unset by legal_mask for ko
+        self._groups = DisjointSet(self._size)
+        self._components = [{i} for i in range(self._size)]
         self._liberties = [set(adj) for adj in self._adjs]
+        self._counts = [self._size, 0, 0]  # empty points, stones of agents
 
     def _check_ko(self):
         try:
             last2, last1 = self[-2:]
+            if last2 is None or last1 is None:
+                return False
             return (len(last1.captures) == 1 and
                     len(last1.captures[0].indices) == 1 and
                     last1.captures[0].indices[0] == last2.action)
         except ValueError:
             return False
 
+    def _ko(self):
+        """Return point forbidden to current agent by ko, -1 if none."""
+        return self[-2].action if self._check_ko() else -1
+
     def legal_actions(self):
         if self._check_ko():
             ko_action = self[-2].action 
@@ -91,58 +222,43 @@ class GoBoard(Board):
                 return False 
         return action in self._legal_actions
 
+    def encode(self, action):
+        """Return point of action, pass is last id."""
+        return self._size if action is None else action
+
+    def decode(self, action_id):
+        return None if action_id == self._size else action_id
+
+    def legal_mask(self):
+        """Return mask of legal points, pass last. Reused, copy to keep.
+
+        Empty points are kept in append and pop, the ko point is unset here.
+
+        """
+        mask = self._mask
+        if self._masked_ko >= 0 and not self._board[self._masked_ko]:
+            mask[self._masked_ko] = True
+        ko = self._ko()
+        if ko >= 0:
+            mask[ko] = False
+        self._masked_ko = ko
+        return mask
+
     def _territory(self):
         """Return score of captured empty components."""
-        score = np.zeros(3)
+        return territory(self._board, self._adjs)
 
-        # depth first search, explicit stac
-        visited = np.array(self._board, dtype='bool')
-        for i in range(81):
-            if visited[i]:
-                continue
-            
-            stack = [i]
-            component = set()
-            threats1 = False
-            threats2 = False
-
-            while stack and not (threats1 and threats2):
-                j = stack.pop()
-                if visited[j]:
-                    continue
-                visited[j] = True
-                component.add(j)
-               
-                for adj in self._adjs[j]:
-                    if self._board[adj] == 1:
-                        threats1 = True 
-                    elif self._board[adj] == 2:
-                        threats2 = True 
-                    elif not visited[adj]:
-                        stack.append(adj) 
-
-            if threats1 and not threats2:
-                score[1] += len(component) 
-            elif threats2 and not threats1:
-                score[2] += len(component) 
-            
-        return score
+    def score(self):
+        """Return area score of each agent, index 0 unused."""
+        empties = (i for i in self._legal_actions if i is not None)
+        return area(self._board.tolist(), self._adjs, empties, self._counts)
 
     def check_winner(self):
-        if ((self[-1] is None and self[-2] is None and len(self) > 1) or 
+        if ((len(self) > 1 and self[-1] is None and self[-2] is None) or 
             len(self._legal_actions) == 1):
-
-            # count stones
-            score = np.zeros(3)
-            for i in range(81):
-                if self._board[i]:
-                    score[self._board[i]] += 1
-            
-            # count territory 
-            score += self._territory()
-
+            score = self.score()
             if score[1] != score[2]:
-                self.winner = score.argmax()
+                self.winner = 1 if score[1] > score[2] else 2
             else:     
                 self.winner = 0
 
@@ -174,10 +290,15 @@ class GoBoard(Board):
         captors = defaultdict(set)
 
         self._groups.atomize(component)
+        self._counts[turn] -= len(component)
+        self._counts[0] += len(component)
         for i in component:
             self._board[i] = 0
+            self._hash_value ^= self.hash_calc(turn, i)
+            self._symm_xor(turn, i)
             self._components[i] = {i}
             self._legal_actions.add(i)
+            self._mask[i] = True
 
         # compute component liberties separate loop, depends on empty board
         # component are all zeroed roots
@@ -198,10 +319,8 @@ class GoBoard(Board):
         return Capture(turn, indices, components, liberties, captors, 
                        boundaries)
 
-    def append(self, action):
-        # check action is legal
-        assert self.legal(action), (
-            'illegal action by agent%d. %s already played.' % (self.turn(), action))
+    def _play(self, action):
+        self._hash_value ^= self._turn_key ^ self._pass_hash(action)
         if action is None:
             self._actions.append(action)
             self.check_winner()
@@ -213,6 +332,9 @@ class GoBoard(Board):
         # place stone
         self._board[action] = trn
         self._legal_actions.remove(action)
+        self._mask[action] = False
+        self._counts[trn] += 1
+        self._counts[0] -= 1
 
         # remove action liberty from adjs
         adjs = set(self._groups.root(i) for i in self._adjs[action])
@@ -247,6 +369,7 @@ class GoBoard(Board):
             captures.append(self._capture(friends[0]))
 
         self._hash_value ^= self.hash_calc(trn, action)
+        self._symm_xor(trn, action)
         action = Action(action, tuple(adjs), join, tuple(captures))
         self._actions.append(action)
         self.check_winner()
@@ -255,9 +378,14 @@ class GoBoard(Board):
         for i, component, liberty in zip(capture.indices, capture.components, 
                                          capture.liberties):
             self._board[i] = capture.turn 
+            self._hash_value ^= self.hash_calc(capture.turn, i)
+            self._symm_xor(capture.turn, i)
             self._components[i] = component
             self._legal_actions.remove(i)
+            self._mask[i] = False
             self._liberties[i] = liberty
+        self._counts[capture.turn] += len(capture.indices)
+        self._counts[0] -= len(capture.indices)
 
         for captor,boundary in zip(capture.captors, capture.boundaries):
             for i in boundary:
@@ -273,8 +401,9 @@ class GoBoard(Board):
         for i,j in zip(join.friends[-2::-1], join.friends[::-1]):
             self._groups.undo_connect(i, j) 
 
-    def pop(self):
+    def _undo(self):
         action = self._actions.pop()
+        self._hash_value ^= self._turn_key ^ self._pass_hash(action)
         if action is None:
             self.winner = None 
             return
@@ -292,20 +421,29 @@ class GoBoard(Board):
         
         self._board[action.action] = 0
         self._legal_actions.add(action.action)
+        self._mask[action.action] = True
+        self._counts[self.turn()] -= 1
+        self._counts[0] += 1
 
-        self._hash_value ^= self.hash_calc(self.turn(), action.action)
+        trn = self.turn()
+        self._hash_value ^= self.hash_calc(trn, action.action)
+        self._symm_xor(trn, action.action)
         return action.action
 
     def clear(self):
         self._board[:] = 0
         self._actions.clear()
-        self._hash_value = self._hashes[0,0]
+        self._hash_value = 0
+        self._symm_hash = 0
         self.winner = None
 
-        self._legal_actions = set(range(81))
+        self._legal_actions = set(range(self._size)) | {None}
+        self._mask[:] = True
+        self._masked_ko = -1
         self._groups.clear()
-        self._components = [{i} for i in range(81)]
+        self._components = [{i} for i in range(self._size)]
         self._liberties = [set(adj) for adj in self._adjs]
+        self._counts = [self._size, 0, 0]
 
     def __str__(self):
         """Return string for command line interface.
@@ -325,28 +463,408 @@ class GoBoard(Board):
         ///////////////////////    ///////////////////////
 
         """
-        result = '/'*23 + '\n'
+        border = '/'*(2*self._width + 5)
+        result = border + '\n'
         for row in self._rows:
             line = '// '
             line += ' '.join(self._pieces[actn] for actn in self._board[row])
             line += ' //'
             result += line + '\n'
-        result += '/'*23
+        result += border
         return result
 
     # logger interface
 
     def debug(self):
         groups = str(self._groups)
-        groups = '\n'.join((' '.join(groups[i:i+9]) for i in range(0, 81, 9)))
+        groups = '\n'.join(' '.join(groups[row]) for row in self._rows)
         groups = '\nCOMPONENTS\n{}'.format(groups)
         return super().debug() + groups 
 
     def info(self):
-        return [action.action for action in self._actions] 
+        return [None if action is None else action.action 
+                for action in self._actions]
+
+    def action_ids(self):
+        return [self._size if action is None else action.action
+                for action in self._actions]
+
+# undo log operations of GoArrayBoard
+PLACE, MERGE, CAPTURE = range(3)
+
+class GoArrayBoard(Board):
+    """GoBoard backend on flat integer arrays with an undo log of ints.
+
+    Each point keeps its color, the id of its group and the next stone of
+    its group, so every group is a linked ring of stones. Each group id 
+    keeps a stone count and pseudo liberties: the number of (stone, empty
+    adjacent point) pairs, zero exactly when the group has no liberties.
+    Groups merge by relabeling the smaller ring and splicing it in, which
+    the same splice undoes. Captured stones keep their group and ring, so
+    undo walks the ring again. Same actions, rules and winners as GoBoard.
+
+    """
+
+    _pieces = PIECES  # strs
+    _width = 9  # points per row, see sized
+    _rows = ROWS  # slices
+    _hashes = HASHES  # ints
+    _adjs = ADJS # ints
+    _symmetries = SYMMETRIES  # index maps
+    _symm_keys = SYMM_KEYS  # ints
+    _action_symmetries = SYMMETRIES  # index maps, passes fixed
+    _action_inverses = GoBoard._action_inverses  # index maps
+    _num_actions = 82  # points, pass last
+    _zero_heuristic = True  # TODO: actual heuristic
+
+    encode = GoBoard.encode
+    decode = GoBoard.decode
+
+    def __init__(self):
+        super().__init__(self._width**2)
+        size = self._size
+        self._board = [0]*size  # color of each point
+        self._group = list(range(size))  # group id of each stone
+        self._next = list(range(size))  # next stone in group ring
+        self._stones = [1]*size  # stone count of each group id
+        self._libs = [0]*size  # pseudo liberties of each group id
+        self._empties = list(range(size))  # empty points, unordered
+        self._mask[-1] = True  # pass, points set by legal_mask
+        self._where = list(range(size))  # index of each point in _empties
+        self._counts = [size, 0, 0]  # empty points, stones of agents
+        self._log = []  # undo operations, args then op code
+        self._marks = []  # length of log before each action
+        self._kos = []  # point illegal after each action, -1 if none
+
+    def _ko(self):
+        """Return point forbidden to current agent by ko, -1 if none."""
+        return self._kos[-1] if self._kos else -1
+
+    def legal_actions(self):
+        ko = self._kos[-1] if self._kos else -1
+        if ko >= 0:
+            return tuple(i for i in self._empties if i != ko) + (None,)
+        return (*self._empties, None)
+
+    def legal(self, action):
+        if action is None:
+            return True
+        return (0 <= action < self._size and not self._board[action] and 
+                action != (self._kos[-1] if self._kos else -1))
+
+    def legal_mask(self):
+        """Return mask of legal points, pass last. Reused, copy to keep.
 
-    # agent interface
+        Set from empty points here, not kept in append and pop.
 
-    def heuristic(self):
-        # TODO: actual heuristic
-        return np.zeros(19557, dtype=np.bool)
+        """
+        mask = self._mask
+        mask[:-1] = False
+        mask[self._empties] = True
+        ko = self._kos[-1] if self._kos else -1
+        if ko >= 0:
+            mask[ko] = False
+        return mask
+
+    def score(self):
+        """Return area score of each agent, index 0 unused."""
+        return area(self._board, self._adjs, self._empties, self._counts)
+
+    def check_winner(self):
+        actions = self._actions
+        if ((len(actions) > 1 and actions[-1] is None and 
+             actions[-2] is None) or not self._empties):
+            score = self.score()
+            if score[1] != score[2]:
+                self.winner = 1 if score[1] > score[2] else 2
+            else:     
+                self.winner = 0
+
+    def _add_empty(self, i):
+        self._where[i] = len(self._empties)
+        self._empties.append(i)
+
+    def _remove_empty(self, i):
+        last = self._empties.pop()
+        if last != i:
+            j = self._where[i]
+            self._empties[j] = last
+            self._where[last] = j
+
+    def _undo_place(self):
+        log = self._log
+        libs = log.pop()
+        stones = log.pop()
+        nxt = log.pop()
+        group = log.pop()
+        i = log.pop()
+        board = self._board
+        self._hash_value ^= self._hashes[board[i]][i]
+        self._symm_xor(board[i], i)
+        for adj in self._adjs[i]:
+            if board[adj]:
+                self._libs[self._group[adj]] += 1
+        self._counts[board[i]] -= 1
+        self._counts[0] += 1
+        board[i] = 0
+        self._add_empty(i)
+        self._group[i] = group
+        self._next[i] = nxt
+        self._stones[i] = stones
+        self._libs[i] = libs
+
+    def _merge(self, g1, g2):
+        """Merge two groups into the larger. Return id of merged group."""
+        if self._stones[g1] < self._stones[g2]:
+            g1, g2 = g2, g1
+        group = self._group
+        nxt = self._next
+        i = g2
+        while True:
+            group[i] = g1
+            i = nxt[i]
+            if i == g2:
+                break
+        nxt[g1], nxt[g2] = nxt[g2], nxt[g1]
+        self._stones[g1] += self._stones[g2]
+        self._libs[g1] += self._libs[g2]
+        self._log.extend((g1, g2, MERGE))
+        return g1
+
+    def _undo_merge(self):
+        g2 = self._log.pop()
+        g1 = self._log.pop()
+        group = self._group
+        nxt = self._next
+        nxt[g1], nxt[g2] = nxt[g2], nxt[g1]
+        i = g2
+        while True:
+            group[i] = g2
+            i = nxt[i]
+            if i == g2:
+                break
+        self._stones[g1] -= self._stones[g2]
+        self._libs[g1] -= self._libs[g2]
+
+    def _capture(self, g):
+        """Remove group g from board. Ring and group ids left in place."""
+        board = self._board
+        group = self._group
+        libs = self._libs
+        nxt = self._next
+        adjs = self._adjs
+        empties = self._empties
+        where = self._where
+        color = board[g]
+        hashes = self._hashes[color]
+        symm_keys = self._symm_keys[color]
+        hash_value = self._hash_value
+        symm_hash = self._symm_hash
+        i = g
+        while True:
+            board[i] = 0
+            where[i] = len(empties)
+            empties.append(i)
+            hash_value ^= hashes[i]
+            symm_hash ^= symm_keys[i]
+            for adj in adjs[i]:
+                if board[adj] and group[adj] != g:
+                    libs[group[adj]] += 1
+            i = nxt[i]
+            if i == g:
+                break
+        self._hash_value = hash_value
+        self._symm_hash = symm_hash
+        self._counts[color] -= self._stones[g]
+        self._counts[0] += self._stones[g]
+        self._log.extend((g, color, CAPTURE))
+
+    def _undo_capture(self):
+        color = self._log.pop()
+        g = self._log.pop()
+        board = self._board
+        group = self._group
+        libs = self._libs
+        i = g
+        while True:
+            board[i] = color
+            self._remove_empty(i)
+            self._hash_value ^= self._hashes[color][i]
+            self._symm_xor(color, i)
+            for adj in self._adjs[i]:
+                if board[adj] and group[adj] != g:
+                    libs[group[adj]] -= 1
+            i = self._next[i]
+            if i == g:
+                break
+        self._counts[color] += self._stones[g]
+        self._counts[0] -= self._stones[g]
+
+    def _play(self, action):
+        actions = self._actions
+        log = self._log
+        self._marks.append(len(log))
+        # turn key, pass key if action flips whether last action passed
+        key = self._turn_key
+        if (bool(actions) and actions[-1] is None) != (action is None):
+            key ^= self._pass_key
+        if action is None:
+            self._hash_value ^= key
+            self._kos.append(-1)
+            actions.append(action)
+            self.check_winner()
+            return
+
+        trn = 1 + len(actions) % 2
+        oth = 3 - trn
+        board = self._board
+        group = self._group
+        libs = self._libs
+        stones = self._stones
+        adjs = self._adjs[action]
+
+        # place stone as new group, log data of old group id
+        log.extend((action, group[action], self._next[action], 
+                    stones[action], libs[action], PLACE))
+        board[action] = trn
+        group[action] = action
+        self._next[action] = action
+        stones[action] = 1
+        empties = self._empties
+        last = empties.pop()
+        if last != action:
+            j = self._where[action]
+            empties[j] = last
+            self._where[last] = j
+        counts = self._counts
+        counts[trn] += 1
+        counts[0] -= 1
+        lib = 0
+        friends = False
+        dead = False  # enemy group left without liberties
+        for adj in adjs:
+            color = board[adj]
+            if not color:
+                lib += 1
+            else:
+                libs[group[adj]] -= 1
+                if color == trn:
+                    friends = True
+                elif not libs[group[adj]]:
+                    dead = True
+        libs[action] = lib
+        self._hash_value ^= key ^ self._hashes[trn][action]
+        self._symm_hash ^= self._symm_keys[trn][action]
+
+        # connect stone with friends
+        root = action
+        if friends:
+            for adj in adjs:
+                if board[adj] == trn and group[adj] != root:
+                    root = self._merge(group[adj], root)
+
+        # check enemy captures: if group has no liberties
+        captures = 0
+        captured = -1
+        if dead:
+            for adj in adjs:
+                if board[adj] == oth and not libs[group[adj]]:
+                    captures += 1
+                    if stones[group[adj]] == 1:
+                        captured = adj
+                    self._capture(group[adj])
+
+        # check self capture
+        if not libs[root]:
+            captures += 1
+            captured = -1
+            self._capture(root)
+
+        # ko: single stone captured was played by other agent last turn
+        if captures == 1 and captured == actions[-1]:
+            self._kos.append(captured)
+        else:
+            self._kos.append(-1)
+
+        actions.append(action)
+        # after a stone, only a full board ends the game
+        if not empties:
+            self.check_winner()
+
+    def _undo(self):
+        action = self._actions.pop()
+        self._kos.pop()
+        mark = self._marks.pop()
+        self.winner = None
+        undo = (self._undo_place, self._undo_merge, self._undo_capture)
+        while len(self._log) > mark:
+            undo[self._log.pop()]()
+        self._hash_value ^= self._turn_key ^ self._pass_hash(action)
+        return action
+
+    def clear(self):
+        size = self._size
+        self._board[:] = [0]*size
+        self._actions.clear()
+        self._hash_value = 0
+        self._symm_hash = 0
+        self.winner = None
+
+        self._group = list(range(size))
+        self._next = list(range(size))
+        self._stones = [1]*size
+        self._libs = [0]*size
+        self._empties = list(range(size))
+        self._where = list(range(size))
+        self._counts = [size, 0, 0]
+        self._log.clear()
+        self._marks.clear()
+        self._kos.clear()
+
+    def __repr__(self):
+        board = np.array(self._board, dtype='uint8')
+        return '\n'.join(str(board[row]) for row in self._rows)
+
+    def __str__(self):
+        border = '/'*(2*self._width + 5)
+        result = border + '\n'
+        for row in self._rows:
+            line = '// '
+            line += ' '.join(self._pieces[actn] for actn in self._board[row])
+            line += ' //'
+            result += line + '\n'
+        result += border
+        return result
+
+    # logger interface
+
+    def info(self):
+        return list(self._actions)
+
+
+@lru_cache(maxsize=None)
+def sized(boardcls, width):
+    """Return go board class like boardcls on width x width board. Cached.
+
+    sized(GoBoard, 19) is class Go19Board(GoBoard) with 19x19 geometry.
+
+    """
+    if width == boardcls._width:
+        return boardcls
+    rows, adjs, hashes, symmetries, symm_keys = get_geometry(width)
+    attrs = {'_width' : width, '_rows' : rows, '_adjs' : adjs, 
+             '_hashes' : hashes, '_symmetries' : symmetries,
+             '_symm_keys' : symm_keys, '_action_symmetries' : symmetries,
+             '_action_inverses' : invert(symmetries),
+             '_num_actions' : width*width + 1,
+             '__module__' : __name__}
+    name = boardcls.__name__.replace('Go', 'Go%d' % width, 1)
+    result = type(name, (boardcls,), attrs)
+    # module level name lets boards pickle
+    globals()[name] = result
+    return result
+
+# register go boards of larger sizes, go9 is an alias of go
+for width in (13, 19):
+    boards('go%d' % width)(sized(GoBoard, width))
+BOARDS.aliases['go9'] = 'go'
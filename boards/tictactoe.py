@@ -1,6 +1,7 @@
 import numpy as np
 
-from boards.board import get_winners, get_hashes, boards, Board
+from boards.board import (get_winners, get_hashes, square_symmetries, invert,
+                          get_symm_keys, boards, Board)
 
 """
 indices
@@ -21,6 +22,15 @@ for j in range(3):  # columns
 _SLICES.extend((slice(0, 9, 4), slice(2, 8, 2)))  # diagonals
 WINNERS = get_winners(9, _SLICES)
 HASHES = get_hashes(3, 9)
+SYMMETRIES = square_symmetries(3)
+SYMM_KEYS = get_symm_keys(HASHES, SYMMETRIES)
+# place values of base 3 board value, as trained weights index states:
+# geomspace rounds 3**5, 3**7 down to 242, 2186
+SCALARS = np.geomspace(1, 3**8, 9, dtype=np.int16)
+# value of piece 1 at each index on each symmetric board
+SYMM_POWERS = np.array([[SCALARS[perm[i]] for perm in SYMMETRIES]
+                        for i in range(9)])
+SYMM_POWERS_T = tuple(map(tuple, SYMM_POWERS.tolist()))  # python ints
 
 del _SLICES
 
@@ -31,10 +41,17 @@ class TicTacToeBoard(Board):
     _rows = ROWS  # slices
     _winners = WINNERS  # tuples
     _hashes = HASHES  # ints
+    _symmetries = SYMMETRIES  # index maps
+    _symm_keys = SYMM_KEYS  # ints
+    _action_symmetries = SYMMETRIES  # index maps
+    _action_inverses = invert(SYMMETRIES)  # index maps
+    _num_actions = 9  # squares
 
     def __init__(self):
         super().__init__(9)
         self._legal_actions = set(range(9))
+        self._mask[:] = True
+        self._symm_values = [0]*8  # value of each symmetric board
 
     def legal_actions(self):
         return tuple(self._legal_actions)
@@ -42,6 +59,9 @@ class TicTacToeBoard(Board):
     def legal(self, action):
         return action in self._legal_actions
 
+    def legal_mask(self):
+        return self._mask
+
     def check_winner(self):
         # agent takes at least 3 turns to win 
         if len(self) < 5:
@@ -52,39 +72,49 @@ class TicTacToeBoard(Board):
         for slc in self._winners[self[-1]]:
             if self._board[slc[0]] == oth and self._board[slc[1]] == oth:
                 self.winner = oth
-                break
+                return
 
         # full board without winner is draw
         if len(self) == 9:
             self.winner = 0
 
-    def append(self, action):
-        assert self.legal(action), (
-            'illegal action by agent%d' % (self.turn()) + repr(self),)
+    def _play(self, action):
         trn = self.turn()
         self._board[action] = trn
         # turn depends on number of moves
         # increment hash value before appending to actions
-        self._hash_value ^= self.hash_calc(trn, action)
+        self._hash_value ^= self.hash_calc(trn, action) ^ self._turn_key
+        self._symm_xor(trn, action)
+        self._symm_values = [value + trn*power for value, power in
+                             zip(self._symm_values, SYMM_POWERS_T[action])]
         self._actions.append(action)
         self._legal_actions.remove(action)
+        self._mask[action] = False
         self.check_winner()
 
-    def pop(self):
+    def _undo(self):
         action = self._actions.pop()
         self._board[action] = 0
         self._legal_actions.add(action)
+        self._mask[action] = True
         self.winner = None
         # turn depends on number of moves
         # decrement hash value after popping from actions
-        self._hash_value ^= self.hash_calc(self.turn(), action)
+        trn = self.turn()
+        self._hash_value ^= self.hash_calc(trn, action) ^ self._turn_key
+        self._symm_xor(trn, action)
+        self._symm_values = [value - trn*power for value, power in
+                             zip(self._symm_values, SYMM_POWERS_T[action])]
         return action
 
     def clear(self):
         self._board[:] = 0
         self._actions.clear()
         self._legal_actions = set(range(9))
-        self._hash_value = self._hashes[0,0]
+        self._mask[:] = True
+        self._hash_value = 0
+        self._symm_hash = 0
+        self._symm_values = [0]*8
         self.winner = None
 
     def __str__(self):
@@ -115,31 +145,36 @@ class TicTacToeBoard(Board):
 
     # agent interface
 
-    _symm_scalars = np.geomspace(1, 3**8, 9, dtype=np.int16)
-
-    def _symm_boards(self):
-        """Yield boards symmetric to square board. Rigid motions."""
-        # identity
-        yield self._board
+    def _minhash(self):
+        """Return least value of boards symmetric to board."""
+        return min(self._symm_values)
 
-        grid = self._board.reshape(3, 3)
+    def heuristic(self):
+        """Enumerate all states mod symmetries. Return one hot vector."""
+        result = np.zeros(self._num_features, dtype=np.bool)
+        result[self._minhash()] = 1
+        return result
 
-        # rotations
-        for i in range(1, 4):
-            yield np.rot90(grid, i).flatten()
+    def active_features(self):
+        return np.array([self._minhash()]), None
 
-        # vertical, horizontal reflections
-        for i in range(2):
-            yield np.flip(grid, i).flatten()
+    def _afterstate_minhashes(self, actions):
+        """Return minhash of afterstate of each action.
 
-        # diagonal reflections
-        yield grid.transpose().flatten()
-        yield self._board[::-1].reshape(3, 3).transpose().flatten()
+        Row of symmetric values of each afterstate is one vector addition.
 
-    def heuristic(self):
-        """Enumerate all states mod symmetries. Return one hot vector."""
-        result = np.zeros(19557, dtype=np.bool)
-        minhash = min(board @ self._symm_scalars 
-                      for board in self._symm_boards())
-        result[minhash] = 1
+        """
+        actions = list(actions)
+        values = self._symm_values + self.turn() * SYMM_POWERS[actions]
+        return values.min(1)
+
+    def afterstate_heuristics(self, actions):
+        """Return one hot heuristic of afterstate of each action as rows."""
+        result = np.zeros((len(actions), self._num_features),
+                          dtype=np.bool)
+        minhashes = self._afterstate_minhashes(actions)
+        result[np.arange(len(actions)), minhashes] = 1
         return result
+
+    def afterstate_values(self, actions, weights):
+        return weights[self._afterstate_minhashes(actions)]
@@ -0,0 +1,224 @@
+from abc import ABC, abstractmethod
+import numpy as np
+
+from boards.tictactoe import SYMM_POWERS
+from boards.connectfour import HEIGHT, SHIFTS
+
+"""
+Boards of n games played in lockstep, one row of the board array per game.
+Each step takes one action per game and applies all of them with a few
+array operations. Pieces are indexed as in TicTacToeBoard, ConnectFourBoard.
+
+winners
+-------
+ONGOING -1, draw 0, agent1 1, agent2 2
+
+"""
+
+ONGOING = -1
+# utility from agent1 pov of each winner
+UTILITIES = np.array([0, 1, -1], dtype=np.int8)
+
+VECTOR_BOARDS = {}
+
+def vector_boards(name):
+    """Decorator with arg name, as boards."""
+
+    def decorator(boardcls):
+        VECTOR_BOARDS[name] = boardcls
+        return boardcls
+
+    return decorator
+
+class VectorBoard(ABC):
+    """Boards of n games as rows of one array.
+
+    Step applies one action per ongoing game and returns utilities and done
+    flags. Finished games restart from the empty board if auto_reset,
+    otherwise they keep their last board and ignore actions.
+
+    """
+
+    _size = 0  # indices per board, also moves of full board
+    _num_actions = 0  # actions per board, columns of legal mask
+
+    def __init__(self, n, auto_reset=True):
+        """Construct n empty boards.
+
+        Args
+        ----
+        n - int
+        auto_reset - bool, clear boards of finished games after step
+
+        """
+        self.auto_reset = auto_reset
+        self.boards = np.zeros((n, self._size), dtype='uint8')
+        self.moves = np.zeros(n, dtype=np.int64)
+        self.winners = np.full(n, ONGOING, dtype=np.int8)
+
+    def __len__(self):
+        """Return number of games."""
+        return len(self.boards)
+
+    def turns(self):
+        """Return agent to act in each game, 1 or 2."""
+        return 1 + self.moves % 2
+
+    def reset(self, mask=None):
+        """Clear boards of games in bool mask, all if None."""
+        if mask is None:
+            mask = slice(None)
+        self.boards[mask] = 0
+        self.moves[mask] = 0
+        self.winners[mask] = ONGOING
+
+    @abstractmethod
+    def legal_mask(self):
+        """Return bool array shape (n, num_actions) of legal actions.
+
+        Rows of finished games are all False.
+
+        """
+
+    @abstractmethod
+    def _place(self, rows, actions, turns):
+        """Place pieces of turns for actions in games of rows."""
+
+    @abstractmethod
+    def _won(self, rows, turns):
+        """Return bool array, True if turns just won game of row."""
+
+    def step(self, actions):
+        """Apply action of each ongoing game.
+
+        Args
+        ----
+        actions - int array shape (n,), ignored for finished games
+
+        Return
+        ------
+        (array, array) - utility from agent1 pov of games finished by step,
+                         0 else; bool done flags of games finished by step
+
+        """
+        actions = np.asarray(actions)
+        rows = np.flatnonzero(self.winners == ONGOING)
+        actions = actions[rows]
+        assert self.legal_mask()[rows, actions].all(), 'illegal action'
+        turns = self.turns()[rows]
+        self._place(rows, actions, turns)
+        self.moves[rows] += 1
+
+        # last agent to act can win, full board without winner is draw
+        won = self._won(rows, turns)
+        winners = np.where(won, turns, ONGOING)
+        winners[~won & (self.moves[rows] == self._size)] = 0
+        self.winners[rows] = winners
+
+        dones = np.zeros(len(self), dtype=bool)
+        dones[rows] = winners != ONGOING
+        utilities = np.where(dones, UTILITIES[self.winners], 0)
+        if self.auto_reset:
+            self.reset(dones)
+        return utilities, dones
+
+    def random_actions(self, rng=None):
+        """Return uniform random legal action of each game, 0 if finished."""
+        rng = rng or np.random.default_rng()
+        mask = self.legal_mask()
+        return np.where(mask, rng.random(mask.shape), -1).argmax(axis=1)
+
+    def afterstate_values(self, weights):
+        """Return linear approx value of afterstate of each action.
+
+        Array shape (n, num_actions), values of illegal actions undefined.
+        Boards without heuristic return zeros.
+
+        """
+        return np.zeros((len(self), self._num_actions))
+
+    def heuristic_actions(self, weights):
+        """Return most valuable legal action of each game for its agent.
+
+        As HeuristicAgent: agent1 maximizes, agent2 minimizes afterstate
+        value. First legal action of ties, 0 if finished.
+
+        """
+        signs = np.where(self.turns() == 1, 1, -1)[:, None]
+        scores = signs * self.afterstate_values(weights)
+        scores[~self.legal_mask()] = -np.inf
+        return scores.argmax(axis=1)
+
+@vector_boards('tictactoe')
+class VectorTicTacToeBoard(VectorBoard):
+    """Vector of TicTacToeBoard. Action is index of square."""
+
+    _size = 9
+    _num_actions = 9
+    # indices of rows, columns, diagonals
+    _lines = np.array([[0, 1, 2], [3, 4, 5], [6, 7, 8], [0, 3, 6],
+                       [1, 4, 7], [2, 5, 8], [0, 4, 8], [2, 4, 6]])
+
+    def legal_mask(self):
+        return (self.boards == 0) & (self.winners == ONGOING)[:, None]
+
+    def _place(self, rows, actions, turns):
+        self.boards[rows, actions] = turns
+
+    def _won(self, rows, turns):
+        lines = self.boards[rows][:, self._lines]
+        return (lines == turns[:, None, None]).all(axis=2).any(axis=1)
+
+    def afterstate_values(self, weights):
+        """Return weights of symmetric minhash of each afterstate."""
+        # value of each symmetric board, as TicTacToeBoard._symm_values
+        values = self.boards.astype(np.int64) @ SYMM_POWERS
+        turns = self.turns()[:, None, None]
+        minhashes = (values[:, None, :] + turns * SYMM_POWERS).min(axis=2)
+        # occupied squares have no afterstate, keep index in range
+        minhashes[self.boards != 0] = 0
+        return weights[minhashes]
+
+@vector_boards('connectfour')
+class VectorConnectFourBoard(VectorBoard):
+    """Vector of ConnectFourBoard. Action is column.
+
+    Boards array holds pieces for observation. Wins are found on uint64
+    bitboards of each agent, laid out as ConnectFourBitBoard.
+
+    """
+
+    _size = 42
+    _num_actions = 7
+
+    def __init__(self, n, auto_reset=True):
+        super().__init__(n, auto_reset)
+        self.heights = np.zeros((n, 7), dtype=np.int64)  # pieces per column
+        self._bits = np.zeros((n, 3), dtype=np.uint64)  # unused, agents
+
+    def reset(self, mask=None):
+        super().reset(mask)
+        if mask is None:
+            mask = slice(None)
+        self.heights[mask] = 0
+        self._bits[mask] = 0
+
+    def legal_mask(self):
+        return (self.heights < 6) & (self.winners == ONGOING)[:, None]
+
+    def _place(self, rows, actions, turns):
+        heights = self.heights[rows, actions]
+        self.boards[rows, heights*7 + actions] = turns
+        self.heights[rows, actions] = heights + 1
+        bits = np.left_shift(np.uint64(1),
+                             (actions*HEIGHT + heights).astype(np.uint64))
+        self._bits[rows, turns] |= bits
+
+    def _won(self, rows, turns):
+        bits = self._bits[rows, turns]
+        result = np.zeros(len(rows), dtype=bool)
+        for shift in SHIFTS:
+            shift = np.uint64(shift)
+            pairs = bits & (bits >> shift)
+            result |= (pairs & (pairs >> (shift + shift))) != 0
+        return result
@@ -1,3 +1,8 @@
+import logging
+import random
+import numpy as np
+
+from games.parallel import seed_of
 from logs.log import get_logger
 
 LOGGER = get_logger(__name__)
@@ -17,6 +22,8 @@ class Game:
         self._board = board
         self._agent1 = agent1
         self._agent2 = agent2
+        self.recorder = None  # RecordWriter of finished runs, see run
+        self.seed = None  # seed of current run, recorded, see run
 
     def legal_actions(self):
         """Return all possible legal actions for current agent.
@@ -52,16 +59,31 @@ class Game:
     def step(self):
         """Query current agent to act. Push action onto board."""
         action = self.current_agent().act(self)
-        LOGGER.debug(self.current_agent().debug(action)) 
+        # skip formatting board strings when debug logging is off
+        debug = LOGGER.isEnabledFor(logging.DEBUG)
+        if debug:
+            LOGGER.debug(self.current_agent().debug(action)) 
         self._board.append(action)
-        LOGGER.debug(self._board.debug())
+        if debug:
+            LOGGER.debug(self._board.debug())
+
+    def run(self, seed=None):
+        """Take steps until board is terminal. Return winner: 0, 1, or 2.
 
-    def run(self):
-        """Take steps until board is terminal. Return winner: 0, 1, or 2."""
+        If seed, seed random and numpy.random first, so run seed replays
+        the same game. Recorded seed is None for unseeded runs.
+
+        """
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
+        self.seed = seed
         while self._board:
             self.step()
         self._update_records()
         LOGGER.info(self.info())
+        if self.recorder is not None:
+            self.recorder.write(self, self.seed)
         return self._board.winner
 
     def _update_records(self):
@@ -83,21 +105,26 @@ class Game:
     def swap_agents(self):
         self._agent1, self._agent2 = self._agent2, self._agent1
 
-    def runs(self, num_runs, index_offset=1):
+    def runs(self, num_runs, index_offset=1, seed=None):
+        """Run game num_runs times. If seed, run r is seeded seed_of(seed, r)."""
         LOGGER.info('AGENT1 {!s}\nAGENT2 {!s}'.format(
             self._agent1, self._agent2))
         for r in range(index_offset, num_runs + index_offset):
             LOGGER.info('RUN {}'.format(r))
             self.clear()
-            self.run()
+            self.run(None if seed is None else seed_of(seed, r))
 
-    def compete(self, num_runs):
-        """Run game num_runs times. Swap who goes first halfway through."""
+    def compete(self, num_runs, seed=None):
+        """Run game num_runs times. Swap who goes first halfway through.
+
+        Runs are seeded as runs, the same seeds as parallel.compete.
+
+        """
         LOGGER.info('GAME {!r}\nNUM RUNS {}'.format(self, num_runs))
         m = num_runs // 2
-        self.runs(m)
+        self.runs(m, seed=seed)
         self.swap_agents()
-        self.runs(num_runs-m, index_offset=m+1)
+        self.runs(num_runs-m, index_offset=m+1, seed=seed)
         self.swap_agents()
         log_info = 'GAME {!r}\nNUM RUNS {} complete!'
         log_info += '\nRESULTS\nAGENT1 {!r}\nAGENT2 {!r}\n'
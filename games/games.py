@@ -1,7 +1,8 @@
+from boards.board import Registry
 from boards.boards import BOARDS
 from games.game import Game
 
-GAMES = {}
+GAMES = Registry(BOARDS.aliases)  # same aliases as BOARDS
 
 def GameFactory(name, gameclsname, boardcls):
     """Return game cls derived from Game base class.
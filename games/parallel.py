@@ -0,0 +1,103 @@
+import threading
+import multiprocessing as mp
+import numpy as np
+
+from logs.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+# game copy of each worker process, set by pool initializer
+_GAME = None
+
+def _init_game(game):
+    global _GAME
+    _GAME = game
+
+def seed_of(seed, run):
+    """Return seed of run, same for any number of workers or order."""
+    return int(np.random.SeedSequence((seed, run)).generate_state(1)[0])
+
+def _run(task):
+    """Play run in worker. Return run, utility from first agent1 pov."""
+    run, swap, seed = task
+    if swap:
+        _GAME.swap_agents()
+    _GAME.clear()
+    _GAME.run(seed)
+    utility = _GAME._board.utility()
+    if swap:
+        _GAME.swap_agents()
+        utility = -utility
+    return run, utility
+
+def _bounded(tasks, semaphore, stop):
+    """Yield tasks, blocking while too many are unfinished, until stop."""
+    for task in tasks:
+        semaphore.acquire()
+        if stop.is_set():
+            return
+        yield task
+
+def imap_bounded(pool, func, tasks, window):
+    """Yield func of tasks from pool as finished, window tasks at most queued.
+
+    Tasks is consumed lazily, so it may depend on results already yielded.
+
+    """
+    semaphore = threading.Semaphore(window)
+    stop = threading.Event()
+    try:
+        for result in pool.imap_unordered(
+                func, _bounded(tasks, semaphore, stop)):
+            semaphore.release()
+            yield result
+    finally:
+        # unblock task feeder if results abandoned early
+        stop.set()
+        semaphore.release()
+
+def results(game, num_runs, workers=None, seed=0, window=None):
+    """Play runs of game in process pool. Yield run, utility as finished.
+
+    Runs 1 to num_runs//2 start with agent1, the rest with agent2, as
+    Game.compete. Run r seeds random and numpy.random with seed_of(seed, r)
+    in its worker. Utility is from agent1 pov. At most window runs are
+    queued at once, memory stays flat for any num_runs.
+
+    Args
+    ----
+    game - Game, pickled to each worker
+    num_runs - int
+    workers - int, default cpu count
+    seed - int
+    window - int, default 4 runs per worker
+
+    Yield
+    -----
+    (int, int) - run number, utility
+
+    """
+    workers = workers or mp.cpu_count()
+    m = num_runs // 2
+    tasks = ((r, r > m, seed_of(seed, r)) for r in range(1, num_runs+1))
+    with mp.Pool(workers, _init_game, (game,)) as pool:
+        yield from imap_bounded(pool, _run, tasks, window or 4*workers)
+
+def compete(game, num_runs, workers=None, seed=0):
+    """Run game num_runs times in parallel as Game.compete.
+
+    Merge results into records of game agents. Log progress of each run.
+
+    """
+    LOGGER.info('GAME {!r}\nNUM RUNS {}\tWORKERS {}'.format(
+                game, num_runs, workers or mp.cpu_count()))
+    for done, (run, utility) in enumerate(
+            results(game, num_runs, workers, seed), 1):
+        game._agent1.update_record(utility)
+        game._agent2.update_record(-utility)
+        LOGGER.info('RUN {}\tUTILITY {}\tDONE {}/{}'.format(
+                    run, utility, done, num_runs))
+    log_info = 'GAME {!r}\nNUM RUNS {} complete!'
+    log_info += '\nRESULTS\nAGENT1 {!r}\nAGENT2 {!r}\n'
+    LOGGER.info(log_info.format(game, num_runs, game._agent1,
+                                game._agent2))
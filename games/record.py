@@ -0,0 +1,175 @@
+"""
+Binary game records. A file starts with MAGIC, then records back to back:
+
+record  - varint length of rest of record, header, actions
+header  - str board name, varint seed + 1 (0 if none), str agent1,
+          str agent2, byte winner, varint number of actions
+actions - varint id of each action, see Board.encode
+str     - varint length, utf8 bytes
+
+Varints are little endian base 128, high bit set on all but the last byte.
+Actions of tictactoe, connectfour and slides of checkers take one byte.
+
+"""
+from collections import namedtuple
+
+from boards.boards import BOARDS
+
+MAGIC = b'BGR\x01'
+
+# seed None if not recorded, winner 0 draw, 1 agent1, 2 agent2
+Record = namedtuple('Record', 'name seed agent1 agent2 winner actions')
+
+def _varint(buffer, value):
+    """Append varint of int value >= 0 to bytearray buffer."""
+    while value > 0x7f:
+        buffer.append(value & 0x7f | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def _str(buffer, string):
+    data = string.encode()
+    _varint(buffer, len(data))
+    buffer += data
+
+def encode_record(name, actions, winner, agent1='', agent2='', seed=None):
+    """Return bytes of record of game name.
+
+    Args
+    ----
+    name - str, name of board in BOARDS
+    actions - iterable of int, action ids
+    winner - int
+    agent1, agent2 - str
+    seed - int >= 0 or None
+
+    Return
+    ------
+    bytes
+
+    """
+    body = bytearray()
+    _str(body, name)
+    _varint(body, 0 if seed is None else seed + 1)
+    _str(body, agent1)
+    _str(body, agent2)
+    body.append(winner)
+    actions = list(actions)
+    _varint(body, len(actions))
+    if all(action < 0x80 for action in actions):
+        body += bytes(actions)
+    else:
+        for action in actions:
+            _varint(body, action)
+    result = bytearray()
+    _varint(result, len(body))
+    return bytes(result + body)
+
+class RecordWriter:
+    """Append records to file at path, buffered.
+
+    Game.run writes the finished game if the game has a recorder. Records
+    are kept in memory until buffer_size bytes, so writes cost little more
+    than encoding. Close, or use as context manager, to flush the rest.
+
+    """
+
+    def __init__(self, path, buffer_size=1 << 16):
+        self._file = open(path, 'ab')
+        if not self._file.tell():
+            self._file.write(MAGIC)
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+        self.records = 0
+
+    def write(self, game, seed=None):
+        """Append record of finished game."""
+        board = game._board
+        self.append(encode_record(game._name, board.action_ids(),
+                                  board.winner, str(game._agent1),
+                                  str(game._agent2), seed))
+
+    def append(self, record):
+        """Append bytes of encoded record."""
+        self._buffer += record
+        self.records += 1
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        self._file.write(self._buffer)
+        self._file.flush()
+        self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _read_varint(data, pos):
+    """Return varint at pos of data, position after it."""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def _read_str(data, pos):
+    size, pos = _read_varint(data, pos)
+    return data[pos:pos+size].decode(), pos + size
+
+def decode_records(data):
+    """Yield records of bytes data of a record file.
+
+    Raise ValueError if data does not start with MAGIC.
+
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('not a game record file')
+    pos = len(MAGIC)
+    while pos < len(data):
+        size, pos = _read_varint(data, pos)
+        stop = pos + size
+        name, pos = _read_str(data, pos)
+        seed, pos = _read_varint(data, pos)
+        agent1, pos = _read_str(data, pos)
+        agent2, pos = _read_str(data, pos)
+        winner = data[pos]
+        num_actions, pos = _read_varint(data, pos + 1)
+        # one byte per action, no varint decoding
+        if stop - pos == num_actions:
+            actions = list(data[pos:stop])
+        else:
+            actions = []
+            for _ in range(num_actions):
+                action, pos = _read_varint(data, pos)
+                actions.append(action)
+        yield Record(name, seed - 1 if seed else None, agent1, agent2,
+                     winner, actions)
+        pos = stop
+
+def read_records(path):
+    """Yield records of file at path."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    yield from decode_records(data)
+
+def replay(record, boardcls=None):
+    """Return board of record name, or boardcls backend, after its actions.
+
+    Action ids are decoded by the board of each position.
+
+    """
+    board = (boardcls or BOARDS[record.name])()
+    for action_id in record.actions:
+        board.play(board.decode(action_id))
+    return board
@@ -0,0 +1,223 @@
+import math
+import random
+import multiprocessing as mp
+from collections import namedtuple
+from statistics import NormalDist
+import numpy as np
+
+from games.games import GAMES
+from games.parallel import imap_bounded, seed_of
+from logs.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+# agent built in each worker as agentcls(name, **kwargs)
+Spec = namedtuple('Spec', 'name agentcls kwargs', defaults=({},))
+
+def elo(scores, games, prior=2, confidence=.95):
+    """Return Elo ratings and confidence interval half widths.
+
+    Bradley-Terry maximum likelihood fit by minorization-maximization, draws
+    count as half wins. As BayesElo, each played pairing gets prior virtual
+    draws, so perfect scores have finite ratings. Ratings average 0.
+
+    Args
+    ----
+    scores - array shape (n, n), points of i against j
+    games - array shape (n, n), games of i against j
+    prior - float, virtual draws per played pairing
+    confidence - float, probability of interval
+
+    Return
+    ------
+    (array, array) - ratings, half widths of confidence intervals
+
+    """
+    played = games + prior * (games > 0)
+    wins = (scores + prior/2 * (games > 0)).sum(axis=1)
+    active = played.sum(axis=1) > 0
+    gamma = np.ones(len(scores))
+    for _ in range(1000):
+        pairs = played / (gamma[:, None] + gamma[None, :])
+        new = np.where(active, wins / np.maximum(pairs.sum(axis=1), 1e-300),
+                       1)
+        new /= np.exp(np.log(new[active]).mean()) if active.any() else 1
+        if np.allclose(new, gamma, rtol=1e-10, atol=0):
+            gamma = new
+            break
+        gamma = new
+
+    # fisher information of log gamma, covariance by pseudo inverse
+    p = gamma[:, None] / (gamma[:, None] + gamma[None, :])
+    info = -played * p * p.T
+    info[np.diag_indices_from(info)] = -info.sum(axis=1)
+    errors = np.sqrt(np.maximum(np.diag(np.linalg.pinv(info)), 0))
+
+    scale = 400 / math.log(10)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    ratings = scale * np.log(gamma)
+    ratings -= ratings[active].mean() if active.any() else 0
+    errors = np.where(active, z * scale * errors, math.inf)
+    return ratings, errors
+
+# game name, specs, agents built so far of each worker process
+_NAME = None
+_SPECS = ()
+_AGENTS = {}
+
+def _init_tournament(name, specs):
+    global _NAME, _SPECS
+    _NAME = name
+    _SPECS = specs
+    _AGENTS.clear()
+
+def _agent(i):
+    """Return agent of spec i, built on first use in this worker."""
+    if i not in _AGENTS:
+        name, agentcls, kwargs = _SPECS[i]
+        _AGENTS[i] = agentcls(name, **kwargs)
+    return _AGENTS[i]
+
+def _play(task):
+    """Play one game in worker. Return i, j, utility from agent i pov."""
+    i, j, swap, seed = task
+    random.seed(seed)
+    np.random.seed(seed)
+    if swap:
+        game = GAMES[_NAME](_agent(j), _agent(i))
+    else:
+        game = GAMES[_NAME](_agent(i), _agent(j))
+    game.run(seed)
+    utility = game._board.utility()
+    return i, j, -utility if swap else utility
+
+class Tournament:
+    """Play pairings of agent specs on a game in worker processes.
+
+    Each pairing plays up to games games, alternating who goes first, and
+    stops once one agent is ahead beyond the confidence interval after
+    min_games. Results are kept as matrices: scores[i, j] points of agent i
+    against j (win 1, draw .5), games[i, j] games played.
+
+    """
+
+    def __init__(self, name, specs, games=100, min_games=10,
+                 confidence=.95, workers=None, seed=0):
+        """Set up tournament of specs on game registered as name in GAMES.
+
+        Args
+        ----
+        name - str
+        specs - list(Spec)
+        games - int, maximum games per pairing
+        min_games - int, games per pairing before stopping early
+        confidence - float, of early stopping and rating intervals
+        workers - int, default cpu count
+        seed - int
+
+        """
+        self._name = name
+        self._specs = tuple(specs)
+        self._max_games = games
+        self._min_games = min_games
+        self._confidence = confidence
+        self._z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self._workers = workers or mp.cpu_count()
+        self._seed = seed
+        n = len(self._specs)
+        self.scores = np.zeros((n, n))
+        self.games = np.zeros((n, n), dtype=np.int64)
+
+    def decided(self, i, j):
+        """Return True if pairing needs no more games."""
+        n = self.games[i, j]
+        if n >= self._max_games:
+            return True
+        if n < self._min_games:
+            return False
+        mean = self.scores[i, j] / n
+        # smoothed score keeps deviation positive for perfect scores
+        p = (self.scores[i, j] + .5) / (n + 1)
+        return abs(mean - .5) > self._z * math.sqrt(p * (1-p) / n)
+
+    def _tasks(self, pairs):
+        """Yield games of undecided pairings, one of each pairing in turn."""
+        n = len(self._specs)
+        for k in range(self._max_games):
+            for i, j in pairs:
+                if not self.decided(i, j):
+                    run = (i*n + j) * self._max_games + k
+                    yield i, j, k % 2 == 1, seed_of(self._seed, run)
+
+    def _play_pairs(self, pool, pairs):
+        """Play pairings until decided. Record results."""
+        for i, j, utility in imap_bounded(pool, _play, self._tasks(pairs),
+                                          4*self._workers):
+            points = (utility + 1) / 2
+            self.scores[i, j] += points
+            self.scores[j, i] += 1 - points
+            self.games[i, j] += 1
+            self.games[j, i] += 1
+            LOGGER.info('{} vs {}\tUTILITY {}\tGAMES {}'.format(
+                        self._specs[i].name, self._specs[j].name,
+                        utility, self.games[i, j]))
+
+    def _swiss_pairs(self):
+        """Return pairings of agents with close points, no rematches."""
+        points = self.scores.sum(axis=1) / np.maximum(self.games.sum(axis=1),
+                                                      1)
+        order = list(np.argsort(-points, kind='stable'))
+        pairs = []
+        while len(order) > 1:
+            i = order.pop(0)
+            for index, j in enumerate(order):
+                if not self.games[i, j]:
+                    pairs.append(tuple(sorted((int(i), int(j)))))
+                    del order[index]
+                    break
+        return pairs
+
+    def run(self, schedule='roundrobin', rounds=None):
+        """Play tournament. Return self.
+
+        Args
+        ----
+        schedule - str, 'roundrobin' all pairings or 'swiss' rounds
+        rounds - int, swiss rounds, default log2 of number of agents
+
+        """
+        n = len(self._specs)
+        LOGGER.info('TOURNAMENT {}\tAGENTS {}\tSCHEDULE {}'.format(
+                    self._name, n, schedule))
+        with mp.Pool(self._workers, _init_tournament,
+                     (self._name, self._specs)) as pool:
+            if schedule == 'roundrobin':
+                pairs = [(i, j) for i in range(n) for j in range(i+1, n)]
+                self._play_pairs(pool, pairs)
+            elif schedule == 'swiss':
+                for _ in range(rounds or math.ceil(math.log2(n))):
+                    pairs = self._swiss_pairs()
+                    if not pairs:
+                        break
+                    self._play_pairs(pool, pairs)
+            else:
+                raise ValueError('unknown schedule %s' % schedule)
+        LOGGER.info(self.info())
+        return self
+
+    def ratings(self):
+        """Return Elo ratings, confidence interval half widths of agents."""
+        return elo(self.scores, self.games, confidence=self._confidence)
+
+    def info(self):
+        """Return table of ratings and scores against each agent."""
+        ratings, errors = self.ratings()
+        width = max(len(spec.name) for spec in self._specs)
+        result = 'RATINGS\n'
+        for k in np.argsort(-ratings, kind='stable'):
+            result += '{:<{}} {:7.1f} +- {:5.1f}  '.format(
+                      self._specs[k].name, width, ratings[k], errors[k])
+            result += ' '.join('{:5.1f}/{:<3d}'.format(s, g) for s, g in
+                               zip(self.scores[k], self.games[k]))
+            result += '\n'
+        return result